@@ -1,12 +1,43 @@
+import heapq
 from collections import deque
 from .depthfirst import DepthFirst
+from code.classes.graph import DIRECTIONS
+from code.classes.symmetry import count_free_axes_after
+from code.classes.folding import PackedFolding
 
 class BreadthFirst(DepthFirst):
+    def __init__(self, protein_sequence, num_valid_folds=1, branch_and_bound=False, symmetry=True, beam_width=None,
+                 energy_model='HPC'):
+        """
+        Initialize the BreadthFirst algorithm, inheriting from DepthFirst.
+        With a beam_width, the chunk heuristic is replaced by a beam search over the whole chain
+        that keeps only the beam_width best partial foldings at every depth.
+        """
+        super().__init__(protein_sequence, num_valid_folds, branch_and_bound, symmetry, energy_model)
+        self.beam_width = beam_width
+        self.beam_search = None  # (number of placed amino acids, beam) of the beam search in progress
+
+    def get_state(self):
+        """
+        Returns the state needed to continue the search after a restart,
+        including the beam and its depth for the beam search.
+        """
+        state = super().get_state()
+        state['beam_search'] = self.beam_search
+        return state
+
+    def set_state(self, state):
+        """
+        Restore the state returned by get_state.
+        """
+        super().set_state(state)
+        self.beam_search = state['beam_search']
+
     def create_search_states(self, base_folding, base_score):
         """
         Creates the initial search states container for BreadthFirst.
         """
-        return deque([(base_folding, 0, base_score)])
+        return deque([(PackedFolding(), 0, base_score)])
     
     def add_search_state(self, states, new_state):
         """
@@ -21,5 +52,102 @@ class BreadthFirst(DepthFirst):
         For BreadthFirst, pops from left (queue behaviour).
         """
         return states.popleft()
-    
-    
\ No newline at end of file
+
+    def restore_state(self, base_length, state):
+        """
+        Brings the graph to the folding of the given state.
+        For BreadthFirst consecutive states are not related, so the graph is rewound to
+        the base folding and the steps are replayed from the packed path of the state.
+        """
+        self.graph.pop_to(base_length)
+        for direction in state[0]:
+            self.graph.push_step(direction)
+
+    def sync_graph(self, directions):
+        """
+        Brings the graph to the given folding, only replaying the steps after
+        the prefix it shares with the folding currently on the graph.
+        """
+        folding = self.graph.folding
+        common = 0
+        limit = min(len(folding), len(directions))
+        while common < limit and folding[common] == directions[common]:
+            common += 1
+
+        self.graph.pop_to(common)
+        for direction in directions[common:]:
+            self.graph.push_step(direction)
+
+    def find_beam_solution(self):
+        """
+        Beam search over the whole chain. At every depth all extensions of the beam are scored
+        and only the beam_width best are kept, ties are broken by the most compact folding
+        (smallest radius of gyration). States are (score, compactness, path, coordinate sums,
+        number of axes used), where path is a PackedFolding, so peak memory stays bounded.
+        With symmetry, only canonical foldings enter the beam.
+        """
+        length = len(self.protein_sequence)
+        self.graph.reset_folding()
+        self.search_complete = False
+
+        # Squared radius of gyration times the number of placed amino acids, from the
+        # sums of the coordinates and of the squared coordinates.
+        # A beam search restored from a checkpoint continues at the depth it reached
+        beam_depth, beam = self.beam_search or (1, [(0, 0, PackedFolding(), (0, 0, 0, 0), 0)])
+
+        for num_placed in range(beam_depth + 1, length + 1):
+            if self.is_time_exceeded():
+                break
+
+            candidates = []
+            for score, _, path, (sum_x, sum_y, sum_z, sum_squares), num_axes in beam:
+                self.sync_graph(path.to_list())
+                x, y, z = self.graph.positions[num_placed - 2]
+                allowed = self.get_exact_directions(num_axes)
+
+                for direction, gain in self.graph.get_step_options():
+                    if allowed is not None and direction not in allowed:
+                        continue
+                    dx, dy, dz = DIRECTIONS[direction]
+                    nx, ny, nz = x + dx, y + dy, z + dz
+                    sums = (sum_x + nx, sum_y + ny, sum_z + nz, sum_squares + nx * nx + ny * ny + nz * nz)
+                    compactness = sums[3] - (sums[0] ** 2 + sums[1] ** 2 + sums[2] ** 2) / num_placed
+                    candidates.append((score + gain, compactness, path.append(direction), sums,
+                                       count_free_axes_after(num_axes, direction)))
+
+            if not candidates:
+                self.beam_search = None
+                return None, None  # Every folding in the beam ran into a dead end
+
+            beam = heapq.nsmallest(self.beam_width, candidates, key=lambda state: state[:2])
+            self.beam_search = (num_placed, beam)
+            self.checkpoint()
+        else:
+            self.search_complete = True
+            self.beam_search = None
+
+        score, _, path, _, _ = beam[0]
+        return path.to_list(), score
+
+    def get_statistics(self):
+        """
+        Returns algorithm specific statistics to store with the experiment results.
+        """
+        if self.beam_width:
+            return {'Beam Width': self.beam_width, 'Search Complete': self.search_complete}
+        return super().get_statistics()
+
+    def find_solutions(self):
+        """
+        Runs the beam search when a beam width is set, otherwise the chunk by chunk search.
+        """
+        if not self.beam_width:
+            return super().find_solutions()
+
+        folding, score = self.find_beam_solution()
+        if folding is not None and self.search_complete:
+            self.best_folding, self.best_score = folding, score
+            return self.best_folding, self.best_score, [score]
+        if self.best_folding is None:
+            self.best_folding, self.best_score = [], 0
+        return self.best_folding, self.best_score, []
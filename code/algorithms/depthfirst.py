@@ -1,20 +1,58 @@
 import time
 from code.classes.graph import Graph
+from code.classes.folding import PackedFolding
+from code.classes.symmetry import canonical_folding, get_canonical_directions, count_free_axes_after
 from code.classes.experiment import TimedExperiment
 
 class DepthFirst:
-    def __init__(self, protein_sequence, num_valid_folds=1):
+    def __init__(self, protein_sequence, num_valid_folds=1, branch_and_bound=False, symmetry=True,
+                 energy_model='HPC'):
         """
         Initialize the DepthFirstSearch algorithm for finding the best protein folding.
+        With branch_and_bound, the chunk heuristic is replaced by an exact search over
+        the whole chain that cuts every state that cannot beat the best folding found.
+        With symmetry, rotated and reflected copies of foldings are not explored twice.
         """
         self.protein_sequence = protein_sequence
         self.num_valid_folds = num_valid_folds
-        self.graph = Graph(protein_sequence)
+        self.branch_and_bound = branch_and_bound
+        self.symmetry = symmetry
+        self.fixed_axes = (3,)  # The chunk heuristic prescribes 'up' steps, so z is not relabelled
+        self.graph = Graph(protein_sequence, energy_model)
         self.best_folding = None
         self.best_score = float('inf')
-        self.all_scores = []
         self.chunk_size = 5
         self.best_chunk_foldings = [[] for _ in range((len(protein_sequence) - 1 + self.chunk_size - 1) // self.chunk_size)]
+        self.energy_bounds = self.calculate_energy_bounds()
+        self.search_complete = False
+
+        # Progress of the search in progress, saved by checkpoints
+        self.chunk_search = None  # (next chunk index, best foldings of the previous chunk)
+        self.exact_search = None  # (stack, folding on the graph, best folding, best score)
+
+    def calculate_energy_bounds(self):
+        """
+        Calculates an optimistic bound on the score the unplaced amino acids can still add.
+        energy_bounds[k] holds the bound when the first k amino acids are placed.
+        Every new bond is counted at the amino acid with the highest index, which is unplaced
+        and can touch at most 4 earlier amino acids (5 for the last one). On the cubic lattice
+        only amino acids at an odd distance of at least 3 in the chain can touch, which limits
+        both the number and the strength of the bonds each amino acid can form.
+        """
+        energy_rows = self.graph.energy_rows
+        types = self.graph.type_codes
+        length = self.graph.length
+        bounds = [0] * (length + 1)
+
+        for j in range(length - 1, -1, -1):
+            max_contacts = 5 if j == length - 1 else 4
+            bond_scores = sorted(
+                energy_rows[j][types[i]]
+                for i in range(j - 3, -1, -2)
+            )
+            bounds[j] = bounds[j + 1] + sum(score for score in bond_scores[:max_contacts] if score < 0)
+
+        return bounds
 
     def get_possible_directions(self, position_in_chunk):
         """
@@ -29,8 +67,10 @@ class DepthFirst:
     def create_search_states(self, base_folding, base_score):
         """
         Creates the initial search states container for DepthFirst.
+        A state is (path, position in chunk, score), where path is a PackedFolding
+        of the steps taken in this chunk.
         """
-        return [(base_folding, 0, base_score)]
+        return [(PackedFolding(), 0, base_score)]
 
     def add_search_state(self, states, new_state):
         """
@@ -46,6 +86,19 @@ class DepthFirst:
         """
         return states.pop()
 
+    def restore_state(self, base_length, state):
+        """
+        Brings the graph to the folding of the given state.
+        For DepthFirst the parent of a state is always on the current path of the graph,
+        so only the steps below the parent are popped and the last step is pushed.
+        """
+        path, pos_in_chunk, _ = state
+        if pos_in_chunk == 0:
+            self.graph.pop_to(base_length)
+            return
+        self.graph.pop_to(base_length + pos_in_chunk - 1)
+        self.graph.push_step(path[-1])
+
     def process_valid_folding(self, best_foldings, best_score, current_folding, current_score):
         """
         Processes a valid folding and updates best_foldings if necessary.
@@ -54,7 +107,7 @@ class DepthFirst:
             if current_score < best_score:
                 best_foldings = []
                 best_score = current_score
-            best_foldings.append((current_folding.copy(), current_score))
+            best_foldings.append((PackedFolding.from_directions(current_folding), current_score))
             
             # Keep only top 10 best foldings
             if len(best_foldings) > 10:
@@ -74,43 +127,233 @@ class DepthFirst:
         
         best_foldings = []
         best_score = float('inf')
+
+        # With canonical base foldings and only canonical directions in the chunk, every
+        # folding explored is its own canonical form, so no symmetric copy is visited twice
+        if self.symmetry:
+            base_foldings = self.canonicalize_foldings(base_foldings)
         
         for base_folding, base_score in base_foldings:
+            # Place the base folding once, the chunk is explored with push/pop on top of it
+            if not self.graph.set_folding(base_folding):
+                continue
+            base_length = len(base_folding)
+            base_axes = {abs(step) for step in base_folding}
             states = self.create_search_states(base_folding, base_score)
             
             while states and not self.is_time_exceeded():
-                current_folding, pos_in_chunk, current_score = self.get_next_state(states)
+                state = self.get_next_state(states)
+                path, pos_in_chunk, current_score = state
+                self.restore_state(base_length, state)
                 
                 # If we've completed this chunk
                 if pos_in_chunk == chunk_length:
-                    # Only add valid folds to best_foldings
-                    if self.graph.apply_folding(current_folding):
-                        score = self.graph.calculate_score()
-                        best_foldings, best_score = self.process_valid_folding(
-                            best_foldings, best_score, current_folding, score
-                        )
+                    best_foldings, best_score = self.process_valid_folding(
+                        best_foldings, best_score, self.graph.folding, current_score
+                    )
                     continue
+
+                directions = self.get_possible_directions(pos_in_chunk)
+                if self.symmetry:
+                    # Only the steps of this chunk can add newly used axes to the base folding
+                    used_axes = base_axes.union(abs(step) for step in self.graph.folding[base_length:])
+                    allowed = get_canonical_directions(len(used_axes - set(self.fixed_axes)), self.fixed_axes)
+                    directions = [direction for direction in directions if direction in allowed]
                 
-                # Try each possible direction
-                for direction in self.get_possible_directions(pos_in_chunk):
-                    new_folding = current_folding + [direction]
-                    if self.graph.apply_folding(new_folding):
-                        score = self.graph.calculate_score()
-                        self.add_search_state(states, (new_folding, pos_in_chunk + 1, score))
+                # Try each possible direction, scoring the free ones without placing them
+                options = dict(self.graph.get_step_options())
+                for direction in directions:
+                    if direction in options:
+                        self.add_search_state(states, (path.append(direction), pos_in_chunk + 1,
+                                                       current_score + options[direction]))
         
         return best_foldings
 
+    def get_statistics(self):
+        """
+        Returns algorithm specific statistics to store with the experiment results.
+        """
+        if self.branch_and_bound:
+            return {'Search Complete': self.search_complete}
+        return {}
+
+    def close(self):
+        """
+        Release resources held by the algorithm.
+        """
+
+    def checkpoint(self):
+        """
+        Hook called at points where get_state fully describes the search.
+        TimedExperiment replaces it to save checkpoints.
+        """
+
+    def is_time_exceeded(self):
+        """
+        Deadline hook checked between chunks, depths and search nodes.
+        TimedExperiment replaces it, without an experiment the search has no deadline.
+        """
+        return False
+
+    def search(self):
+        """
+        Anytime interface of the solver: a generator that yields (folding, score, scores)
+        after every call to find_solutions, which stops at the deadline itself.
+        The empty placeholder folding of a search cut off by the deadline is not reported.
+        The exact and beam searches are deterministic, so they stop once they are complete.
+        """
+        while not self.search_complete and not self.is_time_exceeded():
+            folding, score, scores = self.find_solutions()
+            if folding is None:
+                return
+            if len(folding) == len(self.protein_sequence) - 1:
+                yield folding, score, scores
+
+    def get_state(self):
+        """
+        Returns the state needed to continue the search after a restart: the chunk index
+        with the best foldings of the previous chunk, or the stack of the exact search.
+        """
+        exact_search = None
+        if self.exact_search:
+            stack, folding, best_folding, best_score = self.exact_search
+            exact_search = ([(children.copy(), num_axes) for children, num_axes in stack],
+                            folding.copy(), best_folding, best_score)
+        return {
+            'best_folding': self.best_folding,
+            'best_score': self.best_score,
+            'search_complete': self.search_complete,
+            'chunk_search': self.chunk_search,
+            'exact_search': exact_search
+        }
+
+    def set_state(self, state):
+        """
+        Restore the state returned by get_state.
+        """
+        self.best_folding = state['best_folding']
+        self.best_score = state['best_score']
+        self.search_complete = state['search_complete']
+        self.chunk_search = state['chunk_search']
+        self.exact_search = state['exact_search']
+
+    def canonicalize_foldings(self, foldings):
+        """
+        Replaces (folding, score) pairs by their canonical form and drops symmetric duplicates.
+        """
+        canonical_foldings = []
+        seen = set()
+        for folding, score in foldings:
+            key = PackedFolding.from_directions(canonical_folding(folding, self.fixed_axes))
+            if key not in seen:
+                seen.add(key)
+                canonical_foldings.append((key, score))
+        return canonical_foldings
+
+    def expand_graph_state(self, allowed=None):
+        """
+        Returns the directions that extend the folding on the graph without crossing,
+        sorted from the worst to the best resulting score (so popping gives the best first).
+        If given, only the allowed directions are considered.
+        """
+        children = [(score, direction) for direction, score in self.graph.get_step_options()
+                    if allowed is None or direction in allowed]
+        children.sort(reverse=True)
+        return [direction for _, direction in children]
+
+    def get_exact_directions(self, num_axes):
+        """
+        Returns the directions allowed by symmetry breaking for a search over the whole chain,
+        where no axis is fixed, or None when symmetry breaking is off.
+        """
+        if not self.symmetry:
+            return None
+        return get_canonical_directions(num_axes)
+
+    def find_exact_solution(self):
+        """
+        Exact branch-and-bound search over the whole chain using push/pop on the graph.
+        A state is cut when its score plus the optimistic bound for the unplaced amino acids
+        cannot beat the best folding found so far.
+        With symmetry, only canonical foldings are explored: the first step is fixed and
+        the first step along every new axis is restricted to its positive direction.
+        """
+        length = len(self.protein_sequence)
+        bounds = self.energy_bounds
+        self.search_complete = False
+
+        if length == 1:
+            self.search_complete = True
+            return [], 0
+
+        if self.exact_search:
+            # Continue the search restored from a checkpoint
+            stack, folding, best_folding, best_score = self.exact_search
+            self.graph.set_folding(folding)
+        else:
+            # One list of untried directions per placed step, with the number of axes used so far
+            self.graph.reset_folding()
+            stack = [(self.expand_graph_state(self.get_exact_directions(0)), 0)]
+            best_folding = None
+            best_score = float('inf')
+        nodes = 0
+
+        while stack:
+            nodes += 1
+            if nodes % 1024 == 0:
+                # Saved before the deadline check, so a paused search continues from here
+                self.exact_search = (stack, self.graph.folding, best_folding, best_score)
+                if self.is_time_exceeded():
+                    return best_folding, best_score
+                self.checkpoint()
+
+            children, num_axes = stack[-1]
+            if not children:
+                stack.pop()
+                if stack:
+                    self.graph.pop_step()
+                continue
+
+            direction = children.pop()
+            self.graph.push_step(direction)
+
+            if self.graph.score + bounds[self.graph.num_placed] >= best_score:
+                self.graph.pop_step()  # Cannot beat the best folding, cut this branch
+                continue
+
+            if self.graph.num_placed == length:
+                best_folding = self.graph.folding.copy()
+                best_score = self.graph.score
+                self.graph.pop_step()
+                continue
+
+            num_axes = count_free_axes_after(num_axes, direction)
+            stack.append((self.expand_graph_state(self.get_exact_directions(num_axes)), num_axes))
+
+        self.search_complete = True
+        self.exact_search = None
+        return best_folding, best_score
+
     def find_solutions(self):
         """
         Runs the search algorithm chunk by chunk.
+        Returns the best folding, its score, and the scores of the foldings found in this call.
         """
-        # Start with empty folding
-        current_foldings = [([], 0)]
+        if self.branch_and_bound:
+            folding, score = self.find_exact_solution()
+            if folding is None:
+                return self.best_folding, self.best_score, []
+            self.best_folding, self.best_score = folding, score
+            return self.best_folding, self.best_score, [score]
+
+        # Start with empty folding, or continue the search restored from a checkpoint
+        first_chunk, current_foldings = self.chunk_search or (0, [([], 0)])
+        scores = []
         
         # Process each chunk
         num_chunks = (len(self.protein_sequence) - 1 + self.chunk_size - 1) // self.chunk_size
         
-        for chunk_index in range(num_chunks):
+        for chunk_index in range(first_chunk, num_chunks):
             if self.is_time_exceeded():
                 break
             
@@ -119,6 +362,7 @@ class DepthFirst:
             
             if not best_chunk_foldings:
                 print(f"No valid foldings found for chunk {chunk_index + 1}")
+                self.chunk_search = None
                 break
             
             # Update current foldings for next chunk
@@ -126,15 +370,20 @@ class DepthFirst:
             
             # Update best overall solution if we're at the last chunk
             if chunk_index == num_chunks - 1:
-                self.best_folding = best_chunk_foldings[0][0]
+                self.best_folding = best_chunk_foldings[0][0].to_list()
                 self.best_score = best_chunk_foldings[0][1]
-                self.all_scores.append(self.best_score)
+                scores.append(self.best_score)
+            elif not self.is_time_exceeded():
+                self.chunk_search = (chunk_index + 1, current_foldings)
+                self.checkpoint()
+        else:
+            self.chunk_search = None  # All chunks are done, the next call starts over
         
         # If no solution was found, return empty results
         if not self.best_folding:
             self.best_folding = []
             self.best_score = 0
         
-        return self.best_folding, self.best_score, self.all_scores
+        return self.best_folding, self.best_score, scores
 
 
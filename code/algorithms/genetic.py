@@ -0,0 +1,235 @@
+import random
+
+import numpy as np
+
+from code.algorithms.random import RandomSolution
+from code.algorithms.simannealing import generate_single_neighbor
+from code.classes.batchevaluator import BatchEvaluator
+from code.classes.moveset import LATTICE_SYMMETRIES
+from code.classes.workerpool import WorkerPool
+
+# Evaluators used by the worker processes, one per protein sequence and energy model
+batch_evaluators = {}
+
+def create_symmetry_tables():
+    """
+    Create a table per non-identity lattice symmetry that maps a folding direction (+ 3)
+    to the direction it is rotated or mirrored to. Applied to the tail of a folding, the
+    tail is transformed rigidly around the amino acid it starts from.
+    """
+    tables = np.zeros((len(LATTICE_SYMMETRIES), 7), dtype=np.int8)
+    for k, symmetry in enumerate(LATTICE_SYMMETRIES):
+        for direction in (1, -1, 2, -2, 3, -3):
+            axis, sign = abs(direction) - 1, 1 if direction > 0 else -1
+            for target_axis, (source_axis, target_sign) in enumerate(symmetry):
+                if source_axis == axis:
+                    tables[k, direction + 3] = (target_axis + 1) * target_sign * sign
+    return tables
+
+SYMMETRY_TABLES = create_symmetry_tables()
+
+def evaluate_chunk(args):
+    """
+    Check and score a chunk of foldings in a worker process of the pool.
+    """
+    protein_sequence, energy_model, foldings = args
+
+    key = (protein_sequence, energy_model)
+    evaluator = batch_evaluators.get(key)
+    if evaluator is None:
+        evaluator = BatchEvaluator(protein_sequence, energy_model=energy_model)
+        batch_evaluators[key] = evaluator
+    return evaluator.evaluate(foldings)
+
+class GeneticAlgorithm(RandomSolution):
+    def __init__(self, protein_sequence, population_size=400, generations=10, crossover_rate=0.9,
+                 mutation_rate=0.3, num_elites=2, tournament_size=3, num_processes=1, energy_model='HPC'):
+        """
+        Initialize the Genetic Algorithm, inheriting from RandomSolution.
+        A population of valid foldings evolves for the given number of generations per call.
+        Parents are chosen by tournament selection. Children take the head of one parent and
+        the tail of another, cut at a random chain position. A child that crosses itself is
+        repaired by rotating or mirroring the tail of the second parent. Children are mutated
+        with the single direction change of SimulatedAnnealing. The num_elites best foldings
+        survive unchanged.
+        All children of a generation are checked and scored at once by the BatchEvaluator,
+        with num_processes > 1 split over a pool of processes.
+        """
+        super().__init__(protein_sequence, energy_model=energy_model)
+        self.population_size = population_size
+        self.generations = generations
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.num_elites = min(num_elites, population_size)
+        self.tournament_size = tournament_size
+        self.num_processes = num_processes
+        self.worker_pool = WorkerPool(num_processes)
+        self.warm_start_folding = None  # Set by TimedExperiment to start from the best known folding
+
+        # Seed the evaluator from the random module so seeded runs are reproducible
+        self.batch_evaluator = BatchEvaluator(protein_sequence, random.getrandbits(64), energy_model)
+        self.rng = self.batch_evaluator.rng
+
+        # Current population as an (N, L-1) array of directions with their scores
+        self.population = None
+        self.population_scores = None
+        self.generation = 0
+
+    def get_state(self):
+        """
+        Returns the state needed to continue the search after a restart.
+        """
+        state = super().get_state()
+        state['population'] = None if self.population is None else self.population.copy()
+        state['population_scores'] = None if self.population_scores is None else self.population_scores.copy()
+        state['generation'] = self.generation
+        return state
+
+    def set_state(self, state):
+        """
+        Restore the state returned by get_state.
+        """
+        super().set_state(state)
+        self.population = state['population']
+        self.population_scores = state['population_scores']
+        self.generation = state['generation']
+
+    def get_statistics(self):
+        """
+        Returns the number of generations.
+        """
+        return {'Generations': self.generation}
+
+    def evaluate(self, foldings):
+        """
+        Check and score a batch of foldings, split over the pool when there is one.
+        Returns a boolean validity array and an int array of scores.
+        """
+        pool = self.worker_pool.get_pool()
+        if pool is None or len(foldings) < self.num_processes:
+            return self.batch_evaluator.evaluate(foldings)
+
+        chunks = np.array_split(foldings, self.num_processes)
+        results = pool.map(evaluate_chunk, [
+            (self.protein_sequence, self.graph.energy_model, chunk) for chunk in chunks
+        ])
+        return np.concatenate([valid for valid, _ in results]), np.concatenate([scores for _, scores in results])
+
+    def create_population(self):
+        """
+        Grow a population of valid random foldings, including the warm start folding when
+        one is set and it is valid.
+        """
+        foldings = []
+        scores = []
+        if self.warm_start_folding is not None:
+            folding, self.warm_start_folding = list(self.warm_start_folding), None
+            if len(folding) == len(self.protein_sequence) - 1 and self.graph.set_folding(folding):
+                foldings.append(folding)
+                scores.append(self.graph.score)
+
+        while len(foldings) < self.population_size:
+            folding, score = self.get_valid_folding()
+            if folding is not None:
+                foldings.append(folding)
+                scores.append(score)
+        # The number of steps is given explicitly, so a protein of one amino acid has zero columns
+        self.population = np.array(foldings, dtype=np.int8).reshape(self.population_size,
+                                                                     len(self.protein_sequence) - 1)
+        self.population_scores = np.array(scores, dtype=np.int32)
+
+    def select_parents(self, num_parents):
+        """
+        Tournament selection: returns the indices of the best of tournament_size random
+        members of the population, num_parents times.
+        """
+        candidates = self.rng.integers(0, self.population_size, size=(num_parents, self.tournament_size))
+        winners = self.population_scores[candidates].argmin(axis=1)
+        return candidates[np.arange(num_parents), winners]
+
+    def repair(self, children, tails, parents, valid, scores):
+        """
+        Replace every child that crosses itself by the best valid variant with its tail
+        rotated or mirrored by one of the lattice symmetries, all scored in one batch.
+        A child without a valid variant is replaced by its first parent.
+        Changes children and scores in place.
+        """
+        invalid = np.flatnonzero(~valid)
+        if not len(invalid):
+            return
+
+        # Shape (symmetries, invalid children, steps)
+        rotated = SYMMETRY_TABLES[:, children[invalid].astype(np.intp) + 3]
+        variants = np.where(tails[invalid], rotated, children[invalid])
+        variant_valid, variant_scores = self.evaluate(variants.reshape(-1, children.shape[1]))
+        variant_valid = variant_valid.reshape(variants.shape[:2])
+        variant_scores = np.where(variant_valid, variant_scores.reshape(variants.shape[:2]), np.iinfo(np.int32).max)
+
+        best = variant_scores.argmin(axis=0)
+        columns = np.arange(len(invalid))
+        repaired = variant_valid[best, columns]
+        children[invalid[repaired]] = variants[best[repaired], columns[repaired]]
+        scores[invalid[repaired]] = variant_scores[best[repaired], columns[repaired]]
+
+        failed = invalid[~repaired]
+        children[failed] = self.population[parents[failed]]
+        scores[failed] = self.population_scores[parents[failed]]
+
+    def mutate(self, children, scores):
+        """
+        Mutate children with a single direction change, keeping only mutations that do
+        not cross the chain. Changes children and scores in place.
+        """
+        selected = np.flatnonzero(self.rng.random(len(children)) < self.mutation_rate)
+        if not len(selected) or not children.shape[1]:
+            return
+
+        mutants = np.array([generate_single_neighbor(children[i].tolist()) for i in selected], dtype=np.int8)
+        valid, mutant_scores = self.evaluate(mutants)
+        children[selected[valid]] = mutants[valid]
+        scores[selected[valid]] = mutant_scores[valid]
+
+    def evolve(self):
+        """
+        Create the next generation from the current population.
+        Returns the scores of the new children.
+        """
+        num_steps = self.population.shape[1]
+        num_children = self.population_size - self.num_elites
+        elites = np.argsort(self.population_scores, kind='stable')[:self.num_elites]
+
+        # One point crossover: the tail after the cut comes from the second parent
+        parents = self.select_parents(num_children)
+        other_parents = self.select_parents(num_children)
+        cuts = self.rng.integers(1, max(2, num_steps), size=num_children)
+        crossover = self.rng.random(num_children) < self.crossover_rate
+        tails = (np.arange(num_steps) >= cuts[:, None]) & crossover[:, None]
+        children = np.where(tails, self.population[other_parents], self.population[parents])
+
+        valid, scores = self.evaluate(children)
+        self.repair(children, tails, parents, valid, scores)
+        self.mutate(children, scores)
+
+        self.population = np.concatenate([self.population[elites], children])
+        self.population_scores = np.concatenate([self.population_scores[elites], scores])
+        self.generation += 1
+        return scores
+
+    def find_solutions(self):
+        """
+        Evolve the population for the given number of generations.
+        Returns the best folding of the population, its score and the scores of the
+        children created in this call.
+        """
+        if self.population is None:
+            self.create_population()
+
+        scores = []
+        for _ in range(self.generations):
+            if self.is_time_exceeded():
+                break
+            scores.extend(self.evolve().tolist())
+            self.checkpoint()
+
+        best_index = self.population_scores.argmin()
+        return self.population[best_index].tolist(), int(self.population_scores[best_index]), scores
@@ -1,12 +1,78 @@
+import random
+
 from code.algorithms.random import RandomSolution
+from code.classes.energycache import EnergyCache
+from code.classes.moveset import MoveSet
 
 class HillClimber(RandomSolution):
-    def __init__(self, protein_sequence, max_iterations=10000, num_valid_folds=1):
+    def __init__(self, protein_sequence, max_iterations=10000, num_valid_folds=1, move_types=None,
+                 energy_model='HPC', cache_size=None):
         """
         Initialize the HillClimber algorithm for finding the best folding, inheriting from RandomSolution.
+        By default neighbours change a single direction of the folding. With move_types
+        (e.g. ('end', 'corner', 'crankshaft', 'pull', 'pivot')) local lattice moves are used,
+        which relocate only a few amino acids and are scored with delta scoring.
+        With a cache_size, the scores of the last cache_size foldings are kept in an LRU
+        cache, so revisited foldings are neither rebuilt nor scored again.
         """
-        super().__init__(protein_sequence, num_valid_folds)
+        super().__init__(protein_sequence, num_valid_folds, energy_model=energy_model)
         self.max_iterations = max_iterations
+        self.move_set = MoveSet(self.graph, move_types) if move_types else None
+        self.energy_cache = EnergyCache(self.graph, cache_size) if cache_size else None
+        self.warm_start_folding = None  # Set by TimedExperiment to start from the best known folding
+        self.warm_start_kicks = 3  # Random direction changes of the warm start folding, 0 to start from it as is
+        self.climb_complete = False  # Whether the last climb ended by itself instead of at the deadline
+
+    def get_start_folding(self):
+        """
+        Returns the folding and score a run starts from: the warm start folding for the
+        first run when one is set, and a valid random folding otherwise.
+        The warm start folding is kicked with warm_start_kicks random direction changes, since
+        a stored folding is usually a local optimum that a climb cannot improve.
+        The graph holds the returned folding.
+        """
+        if self.warm_start_folding is not None:
+            folding, self.warm_start_folding = list(self.warm_start_folding), None
+            if len(folding) == len(self.protein_sequence) - 1 and self.graph.set_folding(folding):
+                if self.warm_start_kicks and folding:
+                    folding = self.kick_folding(folding)
+                if folding is not None:
+                    return folding, self.graph.score
+        return self.get_valid_folding()
+
+    def kick_folding(self, folding, max_attempts=100):
+        """
+        Returns a valid copy of the folding with warm_start_kicks random directions changed,
+        or None when no attempt is valid. The graph holds the returned folding.
+        """
+        possible_directions = [1, -1, 2, -2, 3, -3]
+        for _ in range(max_attempts):
+            kicked = folding.copy()
+            for index in random.sample(range(len(kicked)), min(self.warm_start_kicks, len(kicked))):
+                kicked[index] = random.choice([d for d in possible_directions if d != kicked[index]])
+            if self.graph.set_folding(kicked):
+                return kicked
+        return None
+
+    def get_statistics(self):
+        """
+        Returns algorithm specific statistics, including the energy cache counters.
+        """
+        statistics = super().get_statistics()
+        if self.energy_cache:
+            statistics.update(self.energy_cache.get_statistics())
+        return statistics
+
+    def evaluate_folding(self, folding):
+        """
+        Returns the score of the folding, or None if it crosses itself.
+        Looked up in the energy cache when it is enabled.
+        """
+        if self.energy_cache:
+            return self.energy_cache.get_score(folding)
+        if self.graph.apply_folding(folding):
+            return self.graph.calculate_score()
+        return None
 
     def generate_all_neighbors(self, current_folding):
         """
@@ -22,13 +88,121 @@ class HillClimber(RandomSolution):
                     neighbor = current_folding.copy()
                     neighbor[i] = direction
                     
-                    if self.graph.apply_folding(neighbor):
-                        score = self.graph.calculate_score()
+                    score = self.evaluate_folding(neighbor)
+                    if score is not None:
                         neighbors.append((neighbor, score))
-                    
-                    self.graph.apply_folding(current_folding)
         return neighbors
 
+    def climb_steps(self, current_folding, current_score):
+        """
+        Steepest descent with single direction changes. Yields the folding and score after
+        every improving step, until no neighbour improves the score or the deadline passes.
+        Sets climb_complete when the climb ends by itself.
+        """
+        self.climb_complete = False
+        iterations = 0
+        while iterations < self.max_iterations:
+            if self.is_time_exceeded():
+                return  # Interrupted, the climb is not complete
+            neighbors = self.generate_all_neighbors(current_folding)
+            
+            if not neighbors:
+                break
+
+            best_neighbor = min(neighbors, key=lambda x: x[1])
+            neighbor_folding, neighbor_score = best_neighbor
+            accepted = neighbor_score < current_score
+            if self.metrics:
+                self.metrics.count('accepted_moves', int(accepted))
+                self.metrics.count('rejected_moves', len(neighbors) - int(accepted))
+
+            if not accepted:
+                break
+
+            current_folding = neighbor_folding
+            current_score = neighbor_score
+            iterations += 1
+            yield current_folding, current_score
+
+        self.climb_complete = True
+
+    def climb_steps_with_moves(self, current_score):
+        """
+        Steepest descent with the local move set, starting from the folding on the graph.
+        Every candidate move is scored with a delta score, only the best one is applied.
+        Yields a copy of the folding and its score after every applied move, until no move
+        improves the score or the deadline passes. Sets climb_complete when the climb ends by itself.
+        """
+        self.climb_complete = False
+        iterations = 0
+        while iterations < self.max_iterations:
+            if self.is_time_exceeded():
+                return  # Interrupted, the climb is not complete
+            best_move = None
+            best_delta = 0
+            num_moves = 0
+            for move in self.move_set.generate_moves():
+                delta = self.graph.calculate_delta_score(move)
+                num_moves += 1
+                if delta < best_delta:
+                    best_move = move
+                    best_delta = delta
+
+            accepted = best_move is not None
+            if self.metrics:
+                self.metrics.count('accepted_moves', int(accepted))
+                self.metrics.count('rejected_moves', num_moves - int(accepted))
+
+            if not accepted:
+                break
+
+            self.graph.move_residues(best_move)
+            current_score += best_delta
+            iterations += 1
+            yield self.graph.folding.copy(), current_score
+
+        self.climb_complete = True
+
+    def climb(self, current_folding, current_score):
+        """
+        Steepest descent with single direction changes until no neighbour improves the score.
+        """
+        for current_folding, current_score in self.climb_steps(current_folding, current_score):
+            pass
+        return current_folding, current_score
+
+    def climb_with_moves(self, current_score):
+        """
+        Steepest descent with the local move set, starting from the folding on the graph.
+        """
+        current_folding = self.graph.folding.copy()
+        for current_folding, current_score in self.climb_steps_with_moves(current_score):
+            pass
+        return current_folding, current_score
+
+    def search(self):
+        """
+        Anytime hill climbing: yields every improving step of the climb, so the best folding
+        is kept when the deadline passes halfway a climb. The score of a climb is reported
+        once it reaches a local optimum, then the next climb starts from a new random folding.
+        A climb interrupted by the deadline is not reported.
+        """
+        while not self.is_time_exceeded():
+            current_folding, current_score = self.get_start_folding()
+            if current_folding is None:
+                continue
+
+            yield current_folding, current_score, []
+            if self.move_set:
+                steps = self.climb_steps_with_moves(current_score)
+            else:
+                steps = self.climb_steps(current_folding, current_score)
+            for current_folding, current_score in steps:
+                yield current_folding, current_score, []
+
+            if self.climb_complete:
+                yield current_folding, current_score, [current_score]
+
     def find_solutions(self):
         """
         Perform Hill Climbing to find the best folding for the protein sequence.
@@ -40,26 +214,14 @@ class HillClimber(RandomSolution):
 
         while valid_attempts < self.num_valid_folds:
             # Get a valid initial state
-            current_folding, current_score = self.get_valid_folding()
+            current_folding, current_score = self.get_start_folding()
             if current_folding is None:
                 continue
-   
-            iterations = 0
-            while iterations < self.max_iterations:
-                neighbors = self.generate_all_neighbors(current_folding)
-                
-                if not neighbors:
-                    break
-
-                best_neighbor = min(neighbors, key=lambda x: x[1])
-                neighbor_folding, neighbor_score = best_neighbor
-
-                if neighbor_score >= current_score:
-                    break
-
-                current_folding = neighbor_folding
-                current_score = neighbor_score
-                iterations += 1
+
+            if self.move_set:
+                current_folding, current_score = self.climb_with_moves(current_score)
+            else:
+                current_folding, current_score = self.climb(current_folding, current_score)
 
             # After hill climbing is complete for this fold
             self.all_scores.append(current_score)  # Store only the final score for this fold
@@ -0,0 +1,182 @@
+from code.algorithms.random import RandomSolution
+from code.algorithms.simannealing import SimulatedAnnealing
+from code.classes.workerpool import WorkerPool
+import random
+import math
+
+# Solvers used by the worker processes, one per protein sequence and energy model
+replica_solvers = {}
+
+def run_replica_segment(args):
+    """
+    Run one replica for a number of annealing steps at a fixed temperature.
+    Used both in-process and in the worker processes of the pool.
+    """
+    protein_sequence, move_types, energy_model, folding, score, temperature, num_steps, seed = args
+
+    key = (protein_sequence, move_types, energy_model)
+    solver = replica_solvers.get(key)
+    if solver is None:
+        solver = ParallelTempering(protein_sequence, move_types=move_types, energy_model=energy_model)
+        replica_solvers[key] = solver
+
+    random.seed(seed)
+    return solver.run_replica(folding, score, temperature, num_steps)
+
+class ParallelTempering(SimulatedAnnealing):
+    def __init__(self, protein_sequence,
+                 max_iterations=10000,
+                 num_replicas=8,
+                 min_temperature=0.5,
+                 max_temperature=10,
+                 swap_interval=100,
+                 num_processes=1,
+                 num_valid_folds=1,
+                 move_types=None,
+                 energy_model='HPC'):
+        """
+        Initialize the Parallel Tempering (replica exchange) algorithm, inheriting from SimulatedAnnealing.
+        Runs num_replicas chains at a geometric ladder of fixed temperatures and
+        swaps configurations between neighbouring temperatures every swap_interval steps.
+        """
+        super().__init__(protein_sequence, max_iterations, max_temperature, 0, num_valid_folds, move_types,
+                         energy_model)
+        self.num_replicas = num_replicas
+        self.swap_interval = swap_interval
+        self.move_types = tuple(move_types) if move_types else None
+        self.worker_pool = WorkerPool(num_processes)
+
+        # Geometric temperature ladder from cold to hot
+        ratio = (max_temperature / min_temperature) ** (1 / max(1, num_replicas - 1))
+        self.temperatures = [min_temperature * ratio ** k for k in range(num_replicas)]
+
+        # Current (folding, score) per temperature, kept between calls to find_solutions
+        self.replicas = []
+        self.swap_attempts = [0] * (num_replicas - 1)
+        self.swap_accepts = [0] * (num_replicas - 1)
+
+    def run_replica(self, folding, score, temperature, num_steps):
+        """
+        Run annealing steps at a fixed temperature.
+        Returns the final folding and score, and the best folding and score seen.
+        """
+        if self.move_set:
+            self.graph.set_folding(folding)  # Local moves work on the folding on the graph
+
+        best_folding, best_score = folding, score
+        for _ in range(num_steps):
+            step = self.anneal_step(folding, score, temperature)
+            if step is None:
+                continue
+            folding, score = step
+
+            if score < best_score:
+                best_folding, best_score = folding.copy(), score
+
+        return folding.copy(), score, best_folding, best_score
+
+    def attempt_swaps(self, offset):
+        """
+        Attempt to swap the configurations of neighbouring temperatures,
+        alternating between even and odd pairs with the offset.
+        """
+        for k in range(offset, self.num_replicas - 1, 2):
+            (_, score_cold), (_, score_hot) = self.replicas[k], self.replicas[k + 1]
+            delta = (1 / self.temperatures[k] - 1 / self.temperatures[k + 1]) * (score_cold - score_hot)
+            self.swap_attempts[k] += 1
+
+            if delta >= 0 or random.random() < math.exp(delta):
+                self.replicas[k], self.replicas[k + 1] = self.replicas[k + 1], self.replicas[k]
+                self.swap_accepts[k] += 1
+
+    def get_swap_acceptance_rates(self):
+        """
+        Returns the swap acceptance rate for every pair of neighbouring temperatures.
+        Rates close to 0 mean the temperatures are too far apart, rates close to 1
+        mean replicas are wasted on temperatures that are too close together.
+        """
+        return [accepts / attempts if attempts else 0
+                for accepts, attempts in zip(self.swap_accepts, self.swap_attempts)]
+
+    def get_statistics(self):
+        """
+        Returns the temperature ladder and swap acceptance rates.
+        """
+        return {
+            'Temperatures': ' '.join(f"{t:.2f}" for t in self.temperatures),
+            'Swap Acceptance Rates': ' '.join(f"{r:.2f}" for r in self.get_swap_acceptance_rates())
+        }
+
+    def get_state(self):
+        """
+        Returns the state needed to continue the search after a restart:
+        the replicas and the swap counts.
+        """
+        state = super().get_state()
+        state.update({
+            'replicas': [(list(folding), score) for folding, score in self.replicas],
+            'swap_attempts': self.swap_attempts.copy(),
+            'swap_accepts': self.swap_accepts.copy()
+        })
+        return state
+
+    def set_state(self, state):
+        """
+        Restore the state returned by get_state.
+        """
+        super().set_state(state)
+        self.replicas = state['replicas']
+        self.swap_attempts = state['swap_attempts']
+        self.swap_accepts = state['swap_accepts']
+
+    def search(self):
+        """
+        Anytime interface: find_solutions checks the deadline between segments itself,
+        so every call is one step of the search instead of a single annealing run.
+        """
+        return RandomSolution.search(self)
+
+    def find_solutions(self):
+        """
+        Perform Parallel Tempering for max_iterations steps per replica.
+        Replicas continue from their previous state on the next call.
+        Returns the best folding of the replicas, its score, and the best score every replica
+        reached in every segment of this call, so no score is reported twice.
+        """
+        self.all_scores = []
+
+        # The first replica is the coldest, so a warm start folding is refined instead of melted
+        while len(self.replicas) < self.num_replicas:
+            folding, score = self.get_start_folding()
+            if folding is not None:
+                self.replicas.append((folding, score))
+
+        best_folding, best_score = min(self.replicas, key=lambda x: x[1])
+        pool = self.worker_pool.get_pool()
+        num_segments = max(1, self.max_iterations // self.swap_interval)
+
+        for segment in range(num_segments):
+            if self.is_time_exceeded():
+                break
+
+            segment_args = [
+                (self.protein_sequence, self.move_types, self.graph.energy_model, folding, score, temperature,
+                 self.swap_interval, random.getrandbits(64))
+                for (folding, score), temperature in zip(self.replicas, self.temperatures)
+            ]
+            if pool is not None:
+                results = pool.map(run_replica_segment, segment_args)
+            else:
+                results = [self.run_replica(*args[3:7]) for args in segment_args]
+
+            self.replicas = []
+            for folding, score, segment_best_folding, segment_best_score in results:
+                self.replicas.append((folding, score))
+                self.all_scores.append(segment_best_score)
+                if segment_best_score < best_score:
+                    best_folding, best_score = segment_best_folding, segment_best_score
+
+            self.attempt_swaps(segment % 2)
+            self.checkpoint()
+
+        return best_folding.copy(), best_score, self.all_scores
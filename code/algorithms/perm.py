@@ -0,0 +1,146 @@
+import math
+import random
+
+from code.algorithms.random import RandomSolution
+
+LOG_TWO = math.log(2)
+
+def log_add(a, b):
+    """
+    Returns log(exp(a) + exp(b)) without overflow, where -inf stands for log(0).
+    """
+    if a < b:
+        a, b = b, a
+    if b == float('-inf'):
+        return a
+    return a + math.log1p(math.exp(b - a))
+
+class PERM(RandomSolution):
+    def __init__(self, protein_sequence, temperature=0.5, upper_threshold=3.0, lower_threshold=0.3,
+                 energy_model='HPC'):
+        """
+        Initialize the Pruned-Enriched Rosenbluth Method, inheriting from RandomSolution.
+        Chains are grown one amino acid at a time, choosing among the free positions with
+        probability proportional to the Boltzmann factor exp(-score change / temperature).
+        The weight of a chain is multiplied by the sum of these factors at every step.
+        A partial chain with more than upper_threshold times the average weight of chains of
+        its length is cloned, both copies with half the weight. A chain with less than
+        lower_threshold times the average is pruned with probability 1/2, or else its weight
+        is doubled. Weights are kept as logarithms, so long chains do not overflow.
+        """
+        super().__init__(protein_sequence, energy_model=energy_model)
+        self.temperature = temperature
+        self.log_upper = math.log(upper_threshold)
+        self.log_lower = math.log(lower_threshold)
+        self.deadline_steps = 256  # Growth steps between checks of the deadline
+
+        # Running estimates of the partition sum per chain length, kept over all tours
+        self.log_weight_sums = [float('-inf')] * len(protein_sequence)
+        self.num_tours = 0
+        self.num_clones = 0
+        self.num_prunes = 0
+        self.best_folding = None
+        self.best_score = float('inf')
+
+    def get_state(self):
+        """
+        Returns the state needed to continue the search after a restart.
+        """
+        state = super().get_state()
+        state.update({
+            'log_weight_sums': self.log_weight_sums.copy(),
+            'num_tours': self.num_tours,
+            'num_clones': self.num_clones,
+            'num_prunes': self.num_prunes,
+            'best_folding': self.best_folding,
+            'best_score': self.best_score
+        })
+        return state
+
+    def set_state(self, state):
+        """
+        Restore the state returned by get_state.
+        """
+        super().set_state(state)
+        self.log_weight_sums = state['log_weight_sums']
+        self.num_tours = state['num_tours']
+        self.num_clones = state['num_clones']
+        self.num_prunes = state['num_prunes']
+        self.best_folding = state['best_folding']
+        self.best_score = state['best_score']
+
+    def get_statistics(self):
+        """
+        Returns the number of tours, clones and prunes.
+        """
+        return {'Tours': self.num_tours, 'Clones': self.num_clones, 'Prunes': self.num_prunes}
+
+    def run_tour(self):
+        """
+        Grow one tour: a chain from the first amino acid with all its clones, depth first.
+        Clones wait on a stack with their length and weight, and are grown further after
+        the graph is popped back to their length. Returns the scores of the complete chains,
+        or None if the deadline passed during the tour.
+        """
+        graph = self.graph
+        graph.reset_folding()
+        self.num_tours += 1
+        log_num_tours = math.log(self.num_tours)
+        num_steps = len(self.protein_sequence) - 1
+        temperature = self.temperature
+        scores = []
+        steps = 0
+
+        stack = [(0, 0.0)]
+        while stack:
+            length, log_weight = stack.pop()
+            graph.pop_to(length)
+
+            while length < num_steps:
+                steps += 1
+                if steps % self.deadline_steps == 0 and self.is_time_exceeded():
+                    return None
+
+                options = graph.get_step_options()
+                if not options:
+                    break  # Dead end, the chain dies
+
+                factors = [math.exp(-delta / temperature) for _, delta in options]
+                direction = random.choices(options, weights=factors)[0][0]
+                graph.push_step(direction)
+                length += 1
+                log_weight += math.log(sum(factors))
+
+                # Population control against the average weight of chains of this length
+                self.log_weight_sums[length] = log_add(self.log_weight_sums[length], log_weight)
+                log_ratio = log_weight - (self.log_weight_sums[length] - log_num_tours)
+                if log_ratio > self.log_upper:
+                    log_weight -= LOG_TWO
+                    stack.append((length, log_weight))
+                    self.num_clones += 1
+                elif log_ratio < self.log_lower:
+                    if random.random() < 0.5:
+                        self.num_prunes += 1
+                        break
+                    log_weight += LOG_TWO
+            else:
+                scores.append(graph.score)
+                if graph.score < self.best_score:
+                    self.best_score = graph.score
+                    self.best_folding = graph.folding.copy()
+
+        return scores
+
+    def find_solutions(self):
+        """
+        Run tours until one produces a complete chain.
+        Returns the best folding found so far, its score, and the scores of the complete
+        chains of the tour.
+        """
+        while True:
+            scores = self.run_tour()
+            if scores is None:
+                return self.best_folding, self.best_score, []
+            self.checkpoint()
+            if scores:
+                return self.best_folding, self.best_score, scores
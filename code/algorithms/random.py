@@ -1,15 +1,31 @@
 import random
 from code.classes.graph import Graph
+from code.classes.batchevaluator import BatchEvaluator
 
 class RandomSolution:
-    def __init__(self, protein_sequence, num_valid_folds=1):
+    def __init__(self, protein_sequence, num_valid_folds=1, batch_size=None, growth=True, rosenbluth=False,
+                 energy_model='HPC'):
         """
         Initialize the RandomSolution algorithm for finding the best folding.
+        With a batch_size, foldings are generated and scored in batches with the BatchEvaluator.
+        With growth, foldings are grown step by step over free positions instead of being
+        drawn blindly and rejected. With rosenbluth, the Rosenbluth weight of every grown
+        folding is added to running totals, so weighted averages over the samples are unbiased.
+        The energy model ('HPC' or 'HP') sets the bond energies used for scoring.
         """
         self.protein_sequence = protein_sequence
         self.num_valid_folds = num_valid_folds
-        self.graph = Graph(protein_sequence)
-        self.all_scores = []
+        self.batch_size = batch_size
+        self.growth = growth
+        self.rosenbluth = rosenbluth
+        self.graph = Graph(protein_sequence, energy_model)
+        # Seed the evaluator from the random module so seeded runs are reproducible
+        self.batch_evaluator = BatchEvaluator(protein_sequence, random.getrandbits(64), energy_model) if batch_size else None
+        self.total_weight = 0
+        self.total_weighted_score = 0
+        self.last_weight = 0
+        self.metrics = None  # Set by Metrics.instrument when the experiment collects metrics
+        self.worker_pool = None  # WorkerPool of solvers that spread their work over processes
 
     def generate_random_folding(self):
         """
@@ -17,33 +33,156 @@ class RandomSolution:
         """
         return [random.choice([1, -1, 2, -2, 3, -3]) for _ in range(len(self.protein_sequence) - 1)]
 
+    def grow_folding(self):
+        """
+        Grow a random folding one amino acid at a time, only choosing among free positions.
+        Returns the folding and its Rosenbluth weight (the product of the number of free
+        positions at every step), or None and weight 0 if the chain runs into a dead end.
+        The running score of the graph is kept up to date while growing.
+        """
+        self.graph.reset_folding()
+        weight = 1
+
+        for _ in range(len(self.protein_sequence) - 1):
+            free_directions = self.graph.get_free_directions()
+            if not free_directions:
+                return None, 0  # Dead end, the caller restarts
+
+            weight *= len(free_directions)
+            self.graph.push_step(random.choice(free_directions))
+
+        if self.metrics:
+            self.metrics.count('score_evaluations')  # The grown folding is scored while it grows
+        return self.graph.folding.copy(), weight
+
     def get_valid_folding(self):
         """
         Generate a valid random folding and its score.
         """
+        if self.growth:
+            folding, self.last_weight = self.grow_folding()
+            if folding is None:
+                return None, None
+            return folding, self.graph.score
+
         folding = self.generate_random_folding()
         if self.graph.apply_folding(folding):
             score = self.graph.calculate_score()
             return folding, score
         return None, None
 
+    def rosenbluth_average_score(self):
+        """
+        Returns the Rosenbluth-weighted average of all scores, which estimates the
+        average score over all valid foldings without the bias of the growth process.
+        """
+        if not self.total_weight:
+            return None
+        return self.total_weighted_score / self.total_weight
+
+    def get_statistics(self):
+        """
+        Returns algorithm specific statistics to store with the experiment results.
+        """
+        if self.rosenbluth:
+            return {'Rosenbluth Average Score': self.rosenbluth_average_score()}
+        return {}
+
+    def close(self):
+        """
+        Release resources held by the algorithm, such as worker pools.
+        """
+        if self.worker_pool is not None:
+            self.worker_pool.close()
+
+    def checkpoint(self):
+        """
+        Hook called at points where get_state fully describes the search.
+        TimedExperiment replaces it to save checkpoints.
+        """
+
+    def is_time_exceeded(self):
+        """
+        Deadline hook checked by the anytime search loops.
+        TimedExperiment replaces it, without an experiment the search has no deadline.
+        """
+        return False
+
+    def search(self):
+        """
+        Anytime interface of the solver: a generator that yields (folding, score, scores)
+        whenever the search finds a folding worth reporting, until the deadline passes or
+        the search is exhausted. The folding and score are the best of the current run,
+        scores holds the scores of the runs completed since the previous yield.
+        By default every call to find_solutions is one step of the search. Incomplete
+        foldings, returned when the deadline passes during a call, are not reported.
+        """
+        while not self.is_time_exceeded():
+            folding, score, scores = self.find_solutions()
+            if folding is None:
+                return
+            if len(folding) == len(self.protein_sequence) - 1:
+                yield folding, score, scores
+
+    def get_state(self):
+        """
+        Returns the state needed to continue the search after a restart.
+        """
+        state = {'total_weight': self.total_weight, 'total_weighted_score': self.total_weighted_score}
+        if self.batch_evaluator:
+            state['batch_rng'] = self.batch_evaluator.rng.bit_generator.state
+        return state
+
+    def set_state(self, state):
+        """
+        Restore the state returned by get_state.
+        """
+        self.total_weight = state['total_weight']
+        self.total_weighted_score = state['total_weighted_score']
+        if self.batch_evaluator and 'batch_rng' in state:
+            self.batch_evaluator.rng.bit_generator.state = state['batch_rng']
+
+    def find_batch_solutions(self):
+        """
+        Generate and score batches of random foldings until a batch contains a valid folding.
+        Returns the best folding, its score, and the scores of the valid foldings in that batch,
+        or no folding when the deadline passes first.
+        """
+        valid_scores = []
+        while len(valid_scores) == 0:
+            if self.is_time_exceeded():
+                return None, None, []
+            foldings = self.batch_evaluator.generate_random_foldings(self.batch_size)
+            valid, scores = self.batch_evaluator.evaluate(foldings)
+            valid_scores = scores[valid]
+
+        best_index = valid.nonzero()[0][valid_scores.argmin()]
+        return foldings[best_index].tolist(), int(scores[best_index]), valid_scores.tolist()
+
     def find_solutions(self):
         """
         Perform random search to find foldings for the protein sequence.
-        Returns the best folding, its score, and all valid scores encountered.
+        Returns the best folding, its score, and the valid scores found in this call.
         """
+        if self.batch_size:
+            return self.find_batch_solutions()
+
         best_folding = None
         best_score = float('inf')
+        scores = []
         valid_attempts = 0
         
-        while valid_attempts < self.num_valid_folds:
+        while valid_attempts < self.num_valid_folds and not self.is_time_exceeded():
             folding, score = self.get_valid_folding()
             if folding is not None:
-                self.all_scores.append(score)
+                scores.append(score)
+                if self.rosenbluth:
+                    self.total_weight += self.last_weight
+                    self.total_weighted_score += self.last_weight * score
                 valid_attempts += 1
                 
                 if score < best_score:
                     best_score = score
                     best_folding = folding
 
-        return best_folding, best_score, self.all_scores
+        return best_folding, best_score, scores
@@ -2,35 +2,152 @@ from code.algorithms.hillclimber import HillClimber
 import random
 import math
 
+def generate_single_neighbor(folding):
+    """
+    Generate a single random neighbor state: a copy of the folding with one direction changed.
+    """
+    possible_directions = [1, -1, 2, -2, 3, -3]
+    neighbor = folding.copy()
+    index = random.randint(0, len(neighbor) - 1)
+    current_direction = neighbor[index]
+    possible_new_directions = [d for d in possible_directions if d != current_direction]
+    neighbor[index] = random.choice(possible_new_directions)
+
+    return neighbor
+
 class SimulatedAnnealing(HillClimber):
     def __init__(self, protein_sequence, 
                  max_iterations=10000, 
                  initial_temperature=10, 
                  cooling_rate=0.0012, 
-                 num_valid_folds=1):
+                 num_valid_folds=1,
+                 move_types=None,
+                 energy_model='HPC',
+                 cache_size=None):
         """
         Initialize the Simulated Annealing algorithm, inheriting from HillClimber.
         """
-        super().__init__(protein_sequence, max_iterations, num_valid_folds)
+        super().__init__(protein_sequence, max_iterations, num_valid_folds, move_types, energy_model, cache_size)
         self.initial_temperature = initial_temperature
         self.cooling_rate = cooling_rate
+        self.warm_start_kicks = 0  # Annealing leaves a local optimum by itself
+        self.checkpoint_steps = 1000  # Annealing steps between calls to the checkpoint hook
+        self.deadline_steps = 100  # Annealing steps between checks of the deadline
+        self.annealing_run = None  # Progress of the annealing run in progress, saved by checkpoints
+
+    def get_state(self):
+        """
+        Returns the state needed to continue the search after a restart,
+        including the temperature and current folding of the annealing run in progress.
+        """
+        state = super().get_state()
+        state['annealing_run'] = self.annealing_run
+        return state
+
+    def set_state(self, state):
+        """
+        Restore the state returned by get_state.
+        """
+        super().set_state(state)
+        self.annealing_run = state['annealing_run']
+        if self.annealing_run and self.move_set:
+            self.graph.set_folding(self.annealing_run['folding'])  # Local moves work on the folding on the graph
 
     def generate_single_neighbor(self, current_folding):
         """
         Generate a single random neighbor state.
         """
-        possible_directions = [1, -1, 2, -2, 3, -3]
-        neighbor = current_folding.copy()
-        index = random.randint(0, len(neighbor) - 1)
-        current_direction = neighbor[index]
-        possible_new_directions = [d for d in possible_directions if d != current_direction]
-        neighbor[index] = random.choice(possible_new_directions)
-        
-        return neighbor
+        return generate_single_neighbor(current_folding)
+
+    def accept_move(self, delta_energy, temperature):
+        """
+        Metropolis criterion: always accept improvements, accept worse states
+        with probability exp(-delta / temperature).
+        """
+        return delta_energy < 0 or random.random() < math.exp(-delta_energy / temperature)
+
+    def anneal_step(self, current_folding, current_score, temperature):
+        """
+        Perform a single annealing step at the given temperature.
+        Returns the (possibly unchanged) current folding and score,
+        or None if the generated neighbor crosses itself.
+        With a move set, the graph holds the current folding and is changed in place.
+        """
+        if self.move_set:
+            move = self.move_set.random_move()
+            if move is None:
+                return None
+
+            delta_energy = self.graph.calculate_delta_score(move)
+            if self.accept_move(delta_energy, temperature):
+                self.graph.move_residues(move)
+                return self.graph.folding, current_score + delta_energy
+            return current_folding, current_score
+
+        # Generate a neighboring state
+        neighbor = self.generate_single_neighbor(current_folding)
+
+        neighbor_score = self.evaluate_folding(neighbor)
+        if neighbor_score is None:
+            return None
+
+        if self.accept_move(neighbor_score - current_score, temperature):
+            return neighbor, neighbor_score
+        return current_folding, current_score
+
+    def anneal(self):
+        """
+        Generator that performs one annealing run, or continues the run paused at the deadline
+        or restored from a checkpoint. Yields the best folding and score of the run at the start
+        and every time they improve. When the deadline passes the run is paused and kept in
+        annealing_run, otherwise annealing_run is None once the run is complete.
+        """
+        if self.annealing_run:
+            run = self.annealing_run
+            current_folding, current_score = run['folding'], run['score']
+            temperature, start_iteration = run['temperature'], run['iteration']
+            best_folding, best_score = run['best_folding'], run['best_score']
+        else:
+            current_folding, current_score = self.get_start_folding()
+            if current_folding is None:
+                return
+
+            temperature = self.initial_temperature
+            start_iteration = 0
+            best_folding = current_folding.copy()
+            best_score = current_score
+        yield best_folding, best_score
+
+        for iteration in range(start_iteration, self.max_iterations):
+            if iteration % self.deadline_steps == 0:
+                self.annealing_run = {
+                    'folding': current_folding.copy(), 'score': current_score,
+                    'temperature': temperature, 'iteration': iteration,
+                    'best_folding': best_folding, 'best_score': best_score
+                }
+                if self.is_time_exceeded():
+                    return
+                if iteration % self.checkpoint_steps == 0:
+                    self.checkpoint()
+
+            step = self.anneal_step(current_folding, current_score, temperature)
+            if step is None:
+                continue
+            current_folding, current_score = step
+            
+            if current_score < best_score:
+                best_folding = current_folding.copy()
+                best_score = current_score
+                yield best_folding, best_score
+            
+            temperature *= (1 - self.cooling_rate)
+
+        self.annealing_run = None
 
     def find_solutions(self):
         """
         Perform Simulated Annealing to find the best folding. 
+        A run paused at the deadline is not counted, but its best folding is returned.
         """
         valid_attempts = 0
         best_overall_score = float('inf')
@@ -38,40 +155,34 @@ class SimulatedAnnealing(HillClimber):
         self.all_scores = []
 
         while valid_attempts < self.num_valid_folds:
-            current_folding, current_score = self.get_valid_folding()
-            if current_folding is None:
+            run_best = None
+            for run_best in self.anneal():
+                pass
+            if run_best is None:
                 continue
+            best_folding, best_score = run_best
 
-            temperature = self.initial_temperature
-            best_folding = current_folding.copy()
-            best_score = current_score
-
-            for _ in range(self.max_iterations):
-                # Generate a neighboring state
-                neighbor = self.generate_single_neighbor(current_folding)
-
-                if not self.graph.apply_folding(neighbor):
-                    continue
-
-                neighbor_score = self.graph.calculate_score()
-                delta_energy = neighbor_score - current_score
-
-                if delta_energy < 0 or random.random() < math.exp(-delta_energy / temperature):
-                    current_folding = neighbor
-                    current_score = neighbor_score
-                
-                if current_score < best_score:
-                    best_folding = current_folding.copy()
-                    best_score = current_score
-                
-                temperature *= (1 - self.cooling_rate)
-            
-            self.all_scores.append(best_score)
-            
             if best_score < best_overall_score:
                 best_overall_score = best_score
                 best_overall_folding = best_folding.copy()
-            
+
+            if self.annealing_run:
+                break  # Paused at the deadline
+            self.all_scores.append(best_score)
             valid_attempts += 1
 
-        return best_overall_folding, best_overall_score, self.all_scores
\ No newline at end of file
+        return best_overall_folding, best_overall_score, self.all_scores
+
+    def search(self):
+        """
+        Anytime simulated annealing: yields every improvement of the best folding of the run,
+        so the best folding is kept when the deadline passes halfway a run. The score of a run
+        is reported once the run is complete, then the next run starts.
+        """
+        while not self.is_time_exceeded():
+            run_best = None
+            for run_best in self.anneal():
+                yield run_best[0], run_best[1], []
+
+            if run_best is not None and not self.annealing_run:
+                yield run_best[0], run_best[1], [run_best[1]]
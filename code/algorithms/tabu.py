@@ -0,0 +1,72 @@
+from code.algorithms.hillclimber import HillClimber
+
+class TabuSearch(HillClimber):
+    def __init__(self, protein_sequence, max_iterations=10000, num_valid_folds=1,
+                 move_types=('end', 'corner', 'crankshaft', 'pull'), tabu_tenure=12, max_stale_iterations=200,
+                 energy_model='HPC'):
+        """
+        Initialize the Tabu Search algorithm, inheriting from HillClimber.
+        Every iteration applies the best local move, also when it makes the score worse,
+        so the search walks out of local optima instead of restarting. Amino acids moved in
+        the last tabu_tenure iterations may not move again, unless the move improves the best
+        score of the run (aspiration). Moves are scored with delta scoring. A run ends after
+        max_stale_iterations iterations without improvement, then a new random folding is used.
+        """
+        if not move_types:
+            raise ValueError("TabuSearch needs at least one move type")
+        super().__init__(protein_sequence, max_iterations, num_valid_folds, move_types, energy_model)
+        self.tabu_tenure = tabu_tenure
+        self.max_stale_iterations = max_stale_iterations
+        self.warm_start_kicks = 0  # Tabu search leaves a local optimum by itself
+
+    def climb_steps_with_moves(self, current_score):
+        """
+        Tabu search with the local move set, starting from the folding on the graph.
+        Yields a copy of the folding and its score every time the best score of the run
+        improves, until the run goes stale, reaches max_iterations or the deadline passes.
+        Sets climb_complete when the run ends by itself.
+        """
+        self.climb_complete = False
+        tabu_until = [0] * self.graph.length  # First iteration at which an amino acid may move again
+        best_score = current_score
+        iteration = 0
+        last_improvement = 0
+
+        while iteration < self.max_iterations and iteration - last_improvement < self.max_stale_iterations:
+            if self.is_time_exceeded():
+                return  # Interrupted, the run is not complete
+            best_move = None
+            best_delta = None
+            num_moves = 0
+            for move in self.move_set.generate_moves():
+                delta = self.graph.calculate_delta_score(move)
+                num_moves += 1
+                if best_delta is not None and delta >= best_delta:
+                    continue
+
+                # Tabu moves are only allowed when they improve the best score of the run
+                if current_score + delta >= best_score and any(tabu_until[i] > iteration for i in move):
+                    continue
+                best_move = move
+                best_delta = delta
+
+            accepted = best_move is not None
+            if self.metrics:
+                self.metrics.count('accepted_moves', int(accepted))
+                self.metrics.count('rejected_moves', num_moves - int(accepted))
+
+            if not accepted:
+                break  # Every move is tabu
+
+            self.graph.move_residues(best_move)
+            current_score += best_delta
+            iteration += 1
+            for i in best_move:
+                tabu_until[i] = iteration + self.tabu_tenure
+
+            if current_score < best_score:
+                best_score = current_score
+                last_improvement = iteration
+                yield self.graph.folding.copy(), current_score
+
+        self.climb_complete = True
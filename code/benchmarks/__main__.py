@@ -0,0 +1,82 @@
+import argparse
+import os
+import sys
+
+from .baseline import save_baseline, load_baseline, compare_results
+from .macro import MACRO_ALGORITHMS, run_macro_benchmarks
+from .micro import run_micro_benchmarks
+from .sequences import BENCHMARK_SEQUENCES, MICRO_LENGTHS
+
+def parse_arguments(argv=None):
+    """
+    Parse the command line arguments of the benchmark runner.
+    """
+    parser = argparse.ArgumentParser(description="Run the micro and macro benchmarks and compare with a baseline.")
+    parser.add_argument('--micro', action='store_true', help="only run the micro benchmarks")
+    parser.add_argument('--macro', action='store_true', help="only run the macro benchmarks")
+    parser.add_argument('--lengths', nargs='+', type=int, default=MICRO_LENGTHS,
+                        help="sequence lengths of the micro benchmarks")
+    parser.add_argument('--duration', type=float, default=0.5, help="seconds per micro benchmark")
+    parser.add_argument('--algorithms', nargs='+', choices=sorted(MACRO_ALGORITHMS),
+                        help="algorithms of the macro benchmarks")
+    parser.add_argument('--sequences', nargs='+', choices=sorted(BENCHMARK_SEQUENCES),
+                        help="sequences of the macro benchmarks")
+    parser.add_argument('--seeds', nargs='+', type=int, default=[1], help="seeds of the macro benchmarks")
+    parser.add_argument('--runtime', type=float, default=5, help="seconds per macro benchmark")
+    parser.add_argument('--baseline', default=os.path.join(os.path.dirname(__file__), 'baseline.json'),
+                        help="JSON baseline to compare with or to save to")
+    parser.add_argument('--save-baseline', action='store_true', help="store the results as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help="allowed fraction a metric may be worse than the baseline")
+    return parser.parse_args(argv)
+
+def print_results(results):
+    """
+    Print one line per benchmark.
+    """
+    for name, result in sorted(results.items()):
+        values = ', '.join(
+            f"{metric} {value:.4g}" if isinstance(value, float) else f"{metric} {value}"
+            for metric, value in result.items()
+        )
+        print(f"{name}: {values}")
+
+def main(argv=None):
+    """
+    Run the benchmarks, then save them as baseline or compare them with the baseline.
+    Returns 1 when a benchmark regressed or when there is no baseline to compare with.
+    """
+    args = parse_arguments(argv)
+    run_micro = args.micro or not args.macro
+    run_macro = args.macro or not args.micro
+
+    results = {}
+    if run_micro:
+        results.update(run_micro_benchmarks(args.lengths, args.duration))
+    if run_macro:
+        results.update(run_macro_benchmarks(args.algorithms, args.sequences, args.seeds, args.runtime))
+    print_results(results)
+
+    if args.save_baseline:
+        # Keep the benchmarks of the baseline that were not run this time
+        baseline = load_baseline(args.baseline) if os.path.exists(args.baseline) else {}
+        baseline.update(results)
+        save_baseline(baseline, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        # Without a baseline the gate cannot pass, otherwise a missing file would hide every regression
+        print(f"No baseline found at {args.baseline}, run with --save-baseline to create one")
+        return 1
+
+    regressions = compare_results(results, load_baseline(args.baseline), args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print("No regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
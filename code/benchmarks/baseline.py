@@ -0,0 +1,48 @@
+import json
+
+# Metrics where a higher value is better, all other compared metrics are better when lower
+HIGHER_IS_BETTER = {'evaluations_per_second', 'fold_applications_per_second'}
+COMPARED_METRICS = ['evaluations_per_second', 'fold_applications_per_second', 'time_to_target', 'peak_memory_mb']
+
+# Absolute slack per metric on top of the relative tolerance, for values too small to compare
+# relatively, such as a few kB of traced memory
+ABSOLUTE_SLACK = {'time_to_target': 0.05, 'peak_memory_mb': 0.5}
+
+def save_baseline(results, filepath):
+    """
+    Store benchmark results as a JSON baseline.
+    """
+    with open(filepath, 'w') as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+def load_baseline(filepath):
+    """
+    Load a JSON baseline stored with save_baseline.
+    """
+    with open(filepath) as f:
+        return json.load(f)
+
+def compare_results(results, baseline, tolerance=0.2):
+    """
+    Compare benchmark results with a baseline.
+    A metric regresses when it is more than tolerance (a fraction) worse than the baseline,
+    or when a target reached in the baseline is no longer reached.
+    Benchmarks missing from the baseline are skipped.
+    Returns a list of messages, one per regression.
+    """
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+
+        for metric in COMPARED_METRICS:
+            old, new = baseline[name].get(metric), result.get(metric)
+            if old is None:
+                continue
+            if new is None:
+                regressions.append(f"{name}: {metric} was {old:.4g}, now not reached")
+            elif metric in HIGHER_IS_BETTER and new < old * (1 - tolerance):
+                regressions.append(f"{name}: {metric} dropped from {old:.4g} to {new:.4g}")
+            elif metric not in HIGHER_IS_BETTER and new > old * (1 + tolerance) + ABSOLUTE_SLACK.get(metric, 0):
+                regressions.append(f"{name}: {metric} rose from {old:.4g} to {new:.4g}")
+    return regressions
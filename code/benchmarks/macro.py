@@ -0,0 +1,106 @@
+import multiprocessing
+import random
+import sys
+import time
+
+import numpy as np
+
+from code.algorithms.random import RandomSolution
+from code.algorithms.hillclimber import HillClimber
+from code.algorithms.simannealing import SimulatedAnnealing
+from code.algorithms.tabu import TabuSearch
+from code.algorithms.paralleltempering import ParallelTempering
+from code.algorithms.perm import PERM
+from code.algorithms.genetic import GeneticAlgorithm
+from code.algorithms.breadthfirst import BreadthFirst
+from code.algorithms.depthfirst import DepthFirst
+from code.classes.metrics import Metrics
+from .sequences import BENCHMARK_SEQUENCES
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Algorithms of the macro benchmarks with their options
+MACRO_ALGORITHMS = {
+    'RandomSolution': (RandomSolution, {}),
+    'HillClimber': (HillClimber, {}),
+    'SimulatedAnnealing': (SimulatedAnnealing, {}),
+    'TabuSearch': (TabuSearch, {}),
+    'ParallelTempering': (ParallelTempering, {}),
+    'PERM': (PERM, {}),
+    'GeneticAlgorithm': (GeneticAlgorithm, {}),
+    'BreadthFirst': (BreadthFirst, {}),
+    'DepthFirst': (DepthFirst, {})
+}
+
+def get_peak_memory():
+    """
+    Returns the peak resident memory of this process in MB, or None if unknown.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 2 ** 10  # Bytes on macOS, KB elsewhere
+
+def run_macro_benchmark(args):
+    """
+    Run one algorithm on one benchmark sequence with a fixed seed for the given runtime.
+    Runs in a fresh worker process, so the peak memory belongs to this benchmark only.
+    """
+    algorithm_name, sequence_name, seed, runtime = args
+    algorithm, options = MACRO_ALGORITHMS[algorithm_name]
+    protein_sequence, target_score = BENCHMARK_SEQUENCES[sequence_name]
+
+    random.seed(seed)
+    np.random.seed(seed)
+    solver = algorithm(protein_sequence, **options)
+    # Count with the same rules as the experiment metrics, without timing every call
+    metrics = Metrics()
+    metrics.instrument(solver, timed=False)
+
+    start = time.perf_counter()
+    solver.is_time_exceeded = lambda: time.perf_counter() - start >= runtime
+    solver.time_remaining = lambda: max(0, runtime - (time.perf_counter() - start))
+
+    best_score = float('inf')
+    time_to_target = None
+    for _, score, _ in solver.search():
+        if score is not None and score < best_score:
+            best_score = score
+        if time_to_target is None and best_score <= target_score:
+            time_to_target = time.perf_counter() - start
+        if solver.is_time_exceeded():
+            break
+
+    elapsed = time.perf_counter() - start
+    solver.close()
+    return f"macro/{algorithm_name}/{sequence_name}/seed{seed}", {
+        'evaluations_per_second': metrics.counters['score_evaluations'] / elapsed,
+        'fold_applications_per_second': metrics.counters['fold_applications'] / elapsed,
+        'time_to_target': time_to_target,
+        'best_score': best_score if best_score != float('inf') else None,
+        'peak_memory_mb': get_peak_memory()
+    }
+
+def run_macro_benchmarks(algorithms=None, sequences=None, seeds=(1,), runtime=5):
+    """
+    Run every algorithm on every benchmark sequence for every seed, one at a time.
+    Returns a dict of benchmark name -> {'evaluations_per_second', 'fold_applications_per_second',
+    'time_to_target', 'best_score', 'peak_memory_mb'}. An evaluation is one scored candidate
+    folding, counted as in Metrics.instrument.
+    """
+    benchmarks = [
+        (algorithm_name, sequence_name, seed, runtime)
+        for algorithm_name in algorithms or MACRO_ALGORITHMS
+        for sequence_name in sequences or BENCHMARK_SEQUENCES
+        for seed in seeds
+    ]
+
+    # One process per benchmark, so the benchmarks do not share memory or caches
+    results = {}
+    with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+        for name, result in pool.imap(run_macro_benchmark, benchmarks):
+            results[name] = result
+    return results
@@ -0,0 +1,116 @@
+import random
+import time
+import tracemalloc
+
+from code.algorithms.random import RandomSolution
+from code.algorithms.hillclimber import HillClimber
+from code.algorithms.simannealing import SimulatedAnnealing
+from code.classes.moveset import MoveSet, MOVE_TYPES
+from .sequences import MICRO_LENGTHS, generate_sequence
+
+def measure_rate(operation, duration):
+    """
+    Call the operation repeatedly for at least duration seconds.
+    Returns the number of calls per second.
+    """
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0
+    while elapsed < duration:
+        for _ in range(10):
+            operation()
+        calls += 10
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+def measure_peak_memory(operation, repeats=10):
+    """
+    Returns the peak memory in MB allocated while calling the operation a few times.
+    Measured in a separate pass, because tracing slows down the calls.
+    """
+    tracemalloc.start()
+    for _ in range(repeats):
+        operation()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2 ** 20
+
+def create_foldings(protein_sequence, num_foldings, seed=0):
+    """
+    Grow a fixed set of valid foldings for the protein sequence.
+    """
+    random.seed(seed)
+    solver = RandomSolution(protein_sequence)
+    foldings = []
+    while len(foldings) < num_foldings:
+        folding, _ = solver.grow_folding()
+        if folding is not None:
+            foldings.append(folding)
+    return foldings
+
+def create_operations(protein_sequence, foldings):
+    """
+    Returns the benchmarked operations for one sequence as name -> function.
+    Every call works on the next folding of the fixed set.
+    """
+    hill_climber = HillClimber(protein_sequence)
+    annealer = SimulatedAnnealing(protein_sequence)
+    graph = hill_climber.graph
+    move_set = MoveSet(annealer.graph, MOVE_TYPES)
+    counter = [0]
+
+    def next_folding():
+        counter[0] = (counter[0] + 1) % len(foldings)
+        return foldings[counter[0]]
+
+    def apply_folding():
+        graph.apply_folding(next_folding())
+
+    def apply_and_score():
+        graph.apply_folding(next_folding())
+        graph.calculate_score()
+
+    def set_folding():
+        graph.set_folding(next_folding())
+
+    def all_neighbors():
+        hill_climber.generate_all_neighbors(next_folding())
+
+    def single_neighbor():
+        annealer.generate_single_neighbor(next_folding())
+
+    def local_move():
+        move = move_set.random_move()
+        if move is not None:
+            annealer.graph.calculate_delta_score(move)
+
+    annealer.graph.set_folding(foldings[0])  # Local moves work on the folding on the graph
+    return {
+        'apply_folding': apply_folding,
+        'apply_and_score': apply_and_score,
+        'set_folding': set_folding,
+        'all_neighbors': all_neighbors,
+        'single_neighbor': single_neighbor,
+        'local_move': local_move
+    }
+
+def run_micro_benchmarks(lengths=MICRO_LENGTHS, duration=0.5, seed=0):
+    """
+    Run the micro benchmarks for random sequences of the given lengths.
+    Returns a dict of benchmark name -> {'evaluations_per_second', 'peak_memory_mb'},
+    where an evaluation is one call of the operation.
+    """
+    results = {}
+    for length in lengths:
+        protein_sequence = generate_sequence(length, seed)
+        foldings = create_foldings(protein_sequence, 20, seed)
+
+        for name, operation in create_operations(protein_sequence, foldings).items():
+            random.seed(seed)
+            rate = measure_rate(operation, duration)
+            random.seed(seed)
+            results[f"micro/{name}/{length}"] = {
+                'evaluations_per_second': rate,
+                'peak_memory_mb': measure_peak_memory(operation)
+            }
+    return results
@@ -0,0 +1,22 @@
+import random
+
+# Standard sequences of the case with a target score for the time to target.
+# The targets are reachable within seconds by the better algorithms, not the optima.
+BENCHMARK_SEQUENCES = {
+    'hp_14': ('HHPHHHPHPHHHPH', -6),
+    'hp_20': ('HPHPPHHPHPPHPHHPPHPH', -9),
+    'hp_36': ('PPPHHPPHHPPPPPHHHHHHHPPHHPPPPHHPPHPP', -14),
+    'hp_50': ('HHPHPHPHPHHHHPHPPPHPPPHPPPPHPPPHPPPHPHHHHPHPHPHPHH', -20),
+    'hpc_36': ('CPPCHPPCHPPCPPHHHHHHCCPCHPPCPCHPPHPC', -40),
+    'hpc_50': ('HCPHPHPHCHHHHPCCPPHPPPHPPPPCPPPHPPPHPHHHHCHPHPHPHH', -35)
+}
+
+# Sequence lengths of the micro benchmarks
+MICRO_LENGTHS = [10, 25, 50, 100, 200]
+
+def generate_sequence(length, seed=0):
+    """
+    Generate a reproducible random HPC sequence of the given length.
+    """
+    rng = random.Random(seed)
+    return ''.join(rng.choice('HPPC') for _ in range(length))
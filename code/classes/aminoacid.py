@@ -1,27 +1,80 @@
+# Amino acid type codes used by the list and array representations of a protein
+TYPE_CODES = {'P': 0, 'H': 1, 'C': 2}
+
+# Bond energy between two amino acid types, indexed by type code (P, H, C)
+ENERGY_MODELS = {
+    'HPC': [
+        [0, 0, 0],    # P-P, P-H, P-C
+        [0, -1, -1],  # H-P, H-H, H-C
+        [0, -1, -5]   # C-P, C-H, C-C
+    ],
+    'HP': [
+        [0, 0, 0],    # C is treated as H
+        [0, -1, -1],
+        [0, -1, -1]
+    ]
+}
+
+def get_energy_table(energy_model):
+    """
+    Returns the energy table of the given energy model ('HPC' or 'HP').
+    """
+    if energy_model not in ENERGY_MODELS:
+        raise ValueError(f"Unknown energy model: {energy_model}")
+    return ENERGY_MODELS[energy_model]
+
 class Aminoacid:
-    def __init__(self, aa_type, position):
+    __slots__ = ('graph', 'index')
+
+    # Possible folding directions, shared by all amino acids
+    folding_options = [(0, 0, 1), (0, 0, -1), (0, 1, 0), (0, -1, 0), (1, 0, 0), (-1, 0, 0)]
+
+    def __init__(self, graph, index):
         """
         Aminoacid class representing an amino acid in the folding.
+        It is a lightweight view on the lists of the graph it belongs to.
+        """
+        self.graph = graph
+        self.index = index
+
+    @property
+    def aa_type(self):
+        """
+        Type of the amino acid (H, P, or C).
+        """
+        return self.graph.protein_sequence[self.index]
+
+    @property
+    def position(self):
+        """
+        Position of the amino acid in the 3D space (x, y, z).
+        """
+        return self.graph.positions[self.index]
+
+    @position.setter
+    def position(self, position):
+        self.graph.positions[self.index] = position
+
+    @property
+    def neighbours(self):
+        """
+        The amino acids directly before and after this one in the chain.
         """
-        self.aa_type = aa_type  # Type of the amino acid (H, P, or C)
-        self.position = position  # Position of the amino acid in the 3D space (x, y, z)
-        self.neighbours = []  # List to store neighbouring amino acids
-        self.folding_options = [(0, 0, 1), (0, 0, -1), (0, 1, 0), (0, -1, 0), (1, 0, 0), (-1, 0, 0)]  # Possible folding directions
+        amino_acids = self.graph.amino_acids
+        return [amino_acids[i] for i in (self.index - 1, self.index + 1) if 0 <= i < len(amino_acids)]
 
     def add_neighbour(self, neighbour):
         """
         Adds a neighbour to current amino acid.
+        Kept for compatibility: neighbours follow from the chain order, so nothing is stored
+        and only the amino acids directly before or after this one can be added.
         """
-        self.neighbours.append(neighbour)
+        if neighbour.graph is not self.graph or abs(neighbour.index - self.index) != 1:
+            raise ValueError("Only the amino acids directly before or after in the chain are neighbours")
 
     def calculate_score_with_neighbour(self, neighbour):
         """
         Calculates the score for two neighbouring amino acids based on their types.
         """
-        if self.aa_type == 'H' and neighbour.aa_type == 'H':
-            return -1  # H-H bond
-        elif self.aa_type == 'C' and neighbour.aa_type == 'C':
-            return -5  # C-C bond
-        elif (self.aa_type == 'H' and neighbour.aa_type == 'C') or (self.aa_type == 'C' and neighbour.aa_type == 'H'):
-            return -1  # H-C or C-H bond
-        return 0  # No bonds
\ No newline at end of file
+        types = self.graph.type_codes
+        return self.graph.energy_table[types[self.index]][types[neighbour.index]]
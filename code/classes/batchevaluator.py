@@ -0,0 +1,143 @@
+import numpy as np
+from .aminoacid import TYPE_CODES, get_energy_table
+
+# Unit vectors indexed by folding direction + 3 (index 3 is unused)
+DIRECTION_TABLE = np.array([
+    (0, 0, -1),  # -3
+    (0, -1, 0),  # -2
+    (-1, 0, 0),  # -1
+    (0, 0, 0),   # unused
+    (1, 0, 0),   # 1
+    (0, 1, 0),   # 2
+    (0, 0, 1)    # 3
+], dtype=np.int16)
+
+# Folding directions in a fixed order, used to draw random steps
+DIRECTION_VALUES = np.array([1, -1, 2, -2, 3, -3], dtype=np.int8)
+
+# Number of (folding, pair) elements the contact kernel handles at once, to bound memory
+KERNEL_CHUNK_SIZE = 2 ** 22
+
+class BatchEvaluator:
+    def __init__(self, protein_sequence, seed=None, energy_model='HPC'):
+        """
+        Vectorized evaluator that checks and scores many foldings of one protein at once.
+        Foldings are passed as an (N, L-1) int8 array of directions.
+        """
+        self.protein_sequence = protein_sequence
+        self.rng = np.random.default_rng(seed)
+        self.length = len(protein_sequence)
+        self.energy_table = np.array(get_energy_table(energy_model), dtype=np.int32)
+        self.types = np.array([TYPE_CODES[aa_type] for aa_type in protein_sequence], dtype=np.int8)
+        self.bonding_indices = np.flatnonzero(self.energy_table[self.types].any(axis=1))
+
+        # Coordinates are shifted by the chain length so they are never negative,
+        # which allows encoding a position as a single integer key
+        self.base = 2 * self.length + 1
+        self.key_dtype = np.int32 if self.base ** 3 < 2 ** 31 else np.int64
+        self.origin_key = (self.length * self.base + self.length) * self.base + self.length
+        self.step_keys = (DIRECTION_TABLE.astype(np.int64) @ np.array([self.base ** 2, self.base, 1], dtype=np.int64)
+                          ).astype(self.key_dtype)
+        # Key offset per direction indexed by the direction as an unsigned byte (-1 is 255)
+        self.byte_step_keys = np.zeros(256, dtype=self.key_dtype)
+        self.byte_step_keys[np.arange(-3, 4) % 256] = self.step_keys
+
+        # Pairs of amino acids that can form a bond: both bond, and they are at an odd
+        # distance of at least 3 in the chain (only those can touch on the cubic lattice)
+        pairs = [
+            (i, j) for i in self.bonding_indices for j in self.bonding_indices
+            if j >= i + 3 and (j - i) % 2 == 1 and self.energy_table[self.types[i], self.types[j]]
+        ]
+        self.contact_pairs = np.array(pairs, dtype=np.intp).reshape(-1, 2)
+        self.contact_energies = self.energy_table[self.types[self.contact_pairs[:, 0]],
+                                                  self.types[self.contact_pairs[:, 1]]]
+
+    def generate_random_foldings(self, num_foldings):
+        """
+        Generate random foldings without immediate reversals.
+        Every self-avoiding folding is equally likely, while far fewer are rejected
+        than when all six directions are drawn blindly.
+        Returns an (N, L-1) transposed view on an array with one contiguous row per step,
+        the layout evaluate works in.
+        """
+        num_steps = self.length - 1
+        if num_steps == 0:
+            return np.empty((num_foldings, 0), dtype=np.int8)
+
+        # Work on the transposed array so every step is a contiguous row
+        steps = np.take(DIRECTION_VALUES, self.rng.integers(0, 5, size=(num_steps, num_foldings), dtype=np.int8))
+        steps[0] = np.take(DIRECTION_VALUES, self.rng.integers(0, 6, size=num_foldings, dtype=np.int8))
+        for step in range(1, num_steps):
+            # The reversal of the previous step is replaced by the sixth direction,
+            # so each step is one of the five non-reversing directions
+            np.putmask(steps[step], steps[step] == -steps[step - 1], DIRECTION_VALUES[5])
+        return steps.T
+
+    def calculate_coordinates(self, foldings):
+        """
+        Calculate the coordinates of every amino acid as an (N, L, 3) array
+        with a cumulative sum over the direction vectors.
+        """
+        steps = DIRECTION_TABLE[foldings.astype(np.intp) + 3]
+        coords = np.zeros((foldings.shape[0], self.length, 3), dtype=np.int32)
+        np.cumsum(steps, axis=1, out=coords[:, 1:])
+        return coords
+
+    def calculate_keys(self, foldings):
+        """
+        Encode the position of every amino acid as a single integer key, as an (L, N) array
+        with one contiguous row per amino acid.
+        The keys are a running sum over the key offset of each direction,
+        so the coordinates never have to be materialized.
+        """
+        step_keys = np.take(self.byte_step_keys, foldings.T.view(np.uint8))
+        keys = np.empty((self.length, foldings.shape[0]), dtype=self.key_dtype)
+        keys[0] = self.origin_key
+        for step in range(self.length - 1):
+            np.add(keys[step], step_keys[step], out=keys[step + 1])
+        return keys
+
+    def check_validity(self, keys):
+        """
+        Returns a boolean array marking the foldings without self-intersections,
+        for keys in the (L, N) layout of calculate_keys.
+        """
+        sorted_keys = np.sort(keys, axis=0)
+        return ~(sorted_keys[1:] == sorted_keys[:-1]).any(axis=0)
+
+    def calculate_scores(self, keys):
+        """
+        Calculate the score of every (valid) folding with a vectorized contact kernel.
+        Two amino acids touch when their keys differ by the key of one lattice step, which
+        is checked for every pair that can bond at once, in chunks of foldings so the
+        (foldings, pairs) arrays stay bounded.
+        Takes keys in the (L, N) layout of calculate_keys.
+        """
+        num_foldings = keys.shape[1]
+        scores = np.zeros(num_foldings, dtype=np.int32)
+        num_pairs = len(self.contact_pairs)
+        if num_foldings == 0 or num_pairs == 0:
+            return scores
+
+        first, second = self.contact_pairs[:, 0], self.contact_pairs[:, 1]
+        chunk_size = max(1, KERNEL_CHUNK_SIZE // num_pairs)
+        for start in range(0, num_foldings, chunk_size):
+            chunk = keys[:, start:start + chunk_size]
+            distances = np.abs(chunk[second] - chunk[first])
+            contacts = (distances == 1) | (distances == self.base) | (distances == self.base ** 2)
+            scores[start:start + chunk_size] = self.contact_energies @ contacts.astype(np.int32)
+
+        return scores
+
+    def evaluate(self, foldings):
+        """
+        Check and score a batch of foldings.
+        Returns a boolean validity array and an int array of scores (0 for invalid foldings).
+        """
+        foldings = np.asarray(foldings, dtype=np.int8)
+        keys = self.calculate_keys(foldings)
+        valid = self.check_validity(keys)
+
+        scores = np.zeros(foldings.shape[0], dtype=np.int32)
+        scores[valid] = self.calculate_scores(keys[:, valid])
+        return valid, scores
@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+class EnergyCache:
+    def __init__(self, graph, max_size=100000):
+        """
+        Bounded LRU cache of folding scores in front of Graph.apply_folding and calculate_score.
+        Foldings are keyed by a tuple of their directions, which is cheap to build and hash.
+        Crossing foldings are cached as None, so revisited invalid foldings are skipped too.
+        On a hit the graph is not changed, so callers may not rely on the folding on the graph.
+        """
+        self.graph = graph
+        self.max_size = max_size
+        self.scores = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_score(self, folding):
+        """
+        Returns the score of the folding, or None if it crosses itself.
+        """
+        key = tuple(folding)
+        scores = self.scores
+        if key in scores:
+            scores.move_to_end(key)
+            self.hits += 1
+            return scores[key]
+
+        self.misses += 1
+        score = self.graph.calculate_score() if self.graph.apply_folding(folding) else None
+        scores[key] = score
+        if len(scores) > self.max_size:
+            scores.popitem(last=False)
+            self.evictions += 1
+        return score
+
+    def hit_rate(self):
+        """
+        Returns the fraction of lookups answered from the cache.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0
+
+    def get_statistics(self):
+        """
+        Returns the cache counters to store with the experiment results.
+        """
+        return {
+            'Cache Hits': self.hits,
+            'Cache Misses': self.misses,
+            'Cache Evictions': self.evictions,
+            'Cache Hit Rate': f"{self.hit_rate():.3f}"
+        }
@@ -1,23 +1,103 @@
 import time
 import csv
+import json
 import os
+import pickle
+import random
+import multiprocessing
 from datetime import datetime
 from functools import wraps
 
+import numpy as np
+
+from .metrics import Metrics
+from .resultsink import ResultSink
+from .resultstore import ResultStore
+
+def run_worker(args):
+    """
+    Run a single-process experiment inside a worker process of the pool.
+    """
+    (algorithm, max_runtime, algorithm_options, protein, seed, verbose, score_file,
+     checkpoint_file, checkpoint_interval, resume, output_dir, metrics, top_k, warm_start_folding) = args
+    experiment = TimedExperiment(algorithm, max_runtime, checkpoint_interval=checkpoint_interval, resume=resume,
+                                 output_dir=output_dir, metrics=metrics, top_k=top_k, **algorithm_options)
+    return experiment.run_search(protein, seed, verbose, score_file, checkpoint_file, warm_start_folding)
+
 class TimedExperiment:
-    def __init__(self, algorithm, max_runtime):
+    def __init__(self, algorithm, max_runtime, num_workers=1, seed=None, checkpoint_interval=None, resume=False,
+                 output_dir="experiment_results", metrics=False, result_store=None, warm_start=False,
+                 top_k=0, **algorithm_options):
         """
         Initialize TimedExperiment with specific algorithm and runtime.
         Runs the algorithm for the given runtime and stores results.
+        With num_workers > 1, every worker process runs its own solver with its own seed
+        for the same runtime, and the results are merged.
+        With checkpoint_interval, the state of the experiment is saved to disk at most every
+        checkpoint_interval seconds, and with resume a run continues from its latest checkpoint.
+        Results and checkpoints are written to output_dir.
+        With metrics, the hot paths of the solver are instrumented and the counters, the time
+        spent on folding, scoring and bookkeeping, and the best score over time are exported
+        as JSON next to the results. Without metrics the solver runs uninstrumented.
+        With result_store, the path of a SQLite database, every run and the best folding per
+        protein are stored in a ResultStore, and with warm_start the first run of solvers that
+        support it (HillClimber and its subclasses, GeneticAlgorithm) starts from the best known
+        folding. Only the first worker gets it, the others start from random foldings.
+        With top_k, the top_k best distinct foldings found by the experiment are kept in
+        the top_foldings of its ResultSink, e.g. to save images of them.
+        Extra keyword arguments are passed to the algorithm, e.g. batch_size for RandomSolution.
         """
         self.algorithm = algorithm
+        self.algorithm_options = algorithm_options
         self.runtime = max_runtime
-        self.output_dir = "experiment_results"
+        self.num_workers = num_workers
+        self.seed = seed
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.pool = None
+        self.output_dir = output_dir
+        self.collect_metrics = metrics
+        self.result_store = result_store
+        self.warm_start = warm_start
+        self.top_k = top_k
+        self.energy_model = algorithm_options.get('energy_model', 'HPC')
         self.start_time = None
+
+        # State of the running search, saved by the checkpoints
+        self.solver = None
+        self.result_sink = None
+        self.best_folding = None
+        self.best_score = float('inf')
+        self.checkpoint_file = None
+        self.last_checkpoint_time = None
+        self.metrics = None
         
         # Create output directory if it doesn't exist
-        if not os.path.exists(self.output_dir):
-            os.makedirs(self.output_dir)
+        os.makedirs(self.output_dir, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def get_pool(self):
+        """
+        Get the worker pool, creating it on first use.
+        The pool is kept alive across proteins so process startup is only paid once.
+        """
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.num_workers)
+        return self.pool
+
+    def close(self):
+        """
+        Shut down the worker pool if one was started.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
 
     def is_time_exceeded(self):
         """
@@ -46,69 +126,230 @@ class TimedExperiment:
         """
         Run the experiment for the specified runtime and collect scores.
         Only save results that were completed within the runtime limit.
+        Returns the best folding, its score and a ResultSink with the statistics of all scores.
+        """
+        base_seed = self.seed if self.seed is not None else random.randrange(2 ** 32)
+
+        # Raw scores are streamed to one file per worker and merged into the results file
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        score_files = [
+            os.path.join(self.output_dir, f"{self.algorithm.__name__}_{timestamp}_{i}.scores")
+            for i in range(self.num_workers)
+        ]
+        checkpoint_files = [self.get_checkpoint_file(protein, i) for i in range(self.num_workers)]
+
+        warm_start_folding = None
+        if self.warm_start and self.result_store:
+            with ResultStore(self.result_store) as store:
+                warm_start_folding, _ = store.get_best_folding(protein, self.energy_model)
+
+        if self.num_workers > 1:
+            # Every worker gets its own seed, only the first one reports progress and gets the warm start
+            worker_args = [
+                (self.algorithm, self.runtime, self.algorithm_options, protein, base_seed + i, i == 0,
+                 score_files[i], checkpoint_files[i], self.checkpoint_interval, self.resume, self.output_dir,
+                 self.collect_metrics, self.top_k, warm_start_folding if i == 0 else None)
+                for i in range(self.num_workers)
+            ]
+            results = self.get_pool().map(run_worker, worker_args)
+        else:
+            results = [self.run_search(protein, base_seed, score_file=score_files[0],
+                                       checkpoint_file=checkpoint_files[0], warm_start_folding=warm_start_folding)]
+
+        # Merge the results of all workers
+        best_folding = None
+        best_score = float('inf')
+        result_sink = ResultSink(top_k=self.top_k)
+        final_runtime = 0
+        statistics = {}
+        metrics = Metrics() if self.collect_metrics else None
+        for worker, (folding, score, worker_sink, runtime, worker_statistics, worker_metrics) in enumerate(results):
+            result_sink.merge(worker_sink)
+            if metrics:
+                metrics.merge(worker_metrics)
+            for name, value in worker_statistics.items():
+                statistics[f"Worker {worker} {name}" if len(results) > 1 else name] = value
+            final_runtime = max(final_runtime, runtime)
+            if folding is not None and score < best_score:
+                best_score = score
+                best_folding = folding
+
+        # The run is complete, so its checkpoints are no longer needed
+        for checkpoint_file in checkpoint_files:
+            if os.path.exists(checkpoint_file):
+                os.remove(checkpoint_file)
+
+        # Save results if any valid solutions were found
+        if result_sink.count:
+            filepath = self.save_results(result_sink, best_score, final_runtime, protein, statistics)
+            if metrics:
+                self.save_metrics(metrics, protein, os.path.splitext(filepath)[0] + '_metrics.json')
+            if self.result_store:
+                with ResultStore(self.result_store) as store:
+                    store.add_run(self.algorithm.__name__, protein, result_sink, best_folding, best_score,
+                                  self.energy_model, base_seed, self.runtime, final_runtime, self.num_workers)
+        else:
+            print("\nNo valid solutions found within the time limit.")
+            result_sink.remove_files()
+            return None, None, result_sink
+
+        return best_folding, best_score, result_sink
+
+    def run_search(self, protein, seed=None, verbose=True, score_file=None, checkpoint_file=None,
+                   warm_start_folding=None):
+        """
+        Run the anytime search of the algorithm in this process until the runtime is exceeded.
+        Work is only lost between the last deadline check of the solver and the deadline.
+        Returns the best folding, its score, a ResultSink with the scores, the final runtime,
+        the statistics reported by the algorithm and the Metrics of the search (None without
+        metrics). Raw scores are appended to score_file.
+        With checkpointing enabled, the state is saved to checkpoint_file, and with resume
+        the search continues from that file when it exists. A warm_start_folding is handed to
+        solvers that can start from it.
         """
+        if seed is not None:
+            random.seed(seed)
+            np.random.seed(seed % 2 ** 32)
+
         self.start_time = time.time()
-        solver = self.algorithm(protein)
+        solver = self.algorithm(protein, **self.algorithm_options)
         
-        # Inject timing methods into the solver
+        # Inject timing and checkpoint methods into the solver
         solver.is_time_exceeded = self.is_time_exceeded
         solver.time_remaining = self.time_remaining
+        solver.checkpoint = self.checkpoint
+        if warm_start_folding is not None and hasattr(solver, 'warm_start_folding'):
+            solver.warm_start_folding = warm_start_folding
+
+        self.solver = solver
+        self.result_sink = ResultSink(score_file, self.top_k)
+        self.best_folding = None
+        self.best_score = float('inf')
+        self.checkpoint_file = checkpoint_file if self.checkpoint_interval else None
+        self.last_checkpoint_time = time.time()
+        if self.resume and checkpoint_file and os.path.exists(checkpoint_file):
+            self.load_checkpoint(checkpoint_file)
+
+        # Instrument after restoring a checkpoint, so only the search itself is measured
+        self.metrics = None
+        if self.collect_metrics:
+            self.metrics = Metrics()
+            self.metrics.instrument(solver)
+            if self.best_folding is not None:
+                self.metrics.record_best(self.best_score)
         
         final_runtime = 0 
-        best_folding = None
-        best_score = float('inf')
-        all_scores = []
         last_update_time = self.start_time
         update_interval = 10
 
-        while not self.is_time_exceeded():
+        # Consume the anytime search of the solver, which checks the deadline itself and
+        # reports every improvement, so the best folding found before the deadline is kept
+        for folding, score, scores_from_run in solver.search():
             current_time = time.time()
+            elapsed_time = current_time - self.start_time
 
             # Update progress every interval
-            if current_time - last_update_time >= update_interval:
-                progress_percentage = ((current_time - self.start_time) / self.runtime) * 100
+            if verbose and current_time - last_update_time >= update_interval:
+                progress_percentage = (elapsed_time / self.runtime) * 100
                 print(f"Progress: {progress_percentage:.2f}% complete", end='\r')
                 last_update_time = current_time
 
-            # Run the algorithm and get results
-            folding, score, scores_from_run = solver.find_solutions()
-            
-            # Break if no valid solution was found
-            if folding is None:
+            if scores_from_run:
+                self.result_sink.add_scores(scores_from_run)
+            final_runtime = min(elapsed_time, self.runtime)
+
+            # Only complete foldings count, never a placeholder of a search cut off early
+            complete = folding is not None and len(folding) == len(protein) - 1
+            if complete and score is not None:
+                self.result_sink.add_folding(folding, score)
+            if complete and score is not None and score < self.best_score:
+                self.best_score = score
+                self.best_folding = folding
+                if self.metrics:
+                    self.metrics.record_best(score)
+
+            if elapsed_time >= self.runtime:
                 break
+            self.checkpoint()
 
-            # Calculate elapsed time
-            elapsed_time = time.time() - self.start_time
+        # A run cut off by the deadline still counts with the best folding it found so far
+        if not self.result_sink.count and self.best_folding is not None:
+            self.result_sink.add(self.best_score)
 
-            # Only collect results if within time limit
-            if elapsed_time < self.runtime:
-                if scores_from_run:
-                    all_scores.extend(scores_from_run)
-                final_runtime = elapsed_time
+        solver.close()
+        self.result_sink.close()
+        if self.metrics:
+            self.metrics.stop()
+        return (self.best_folding, self.best_score, self.result_sink, final_runtime, solver.get_statistics(),
+                self.metrics)
 
-                if score is not None and score < best_score:
-                    best_score = score
-                    best_folding = folding
-            else:
-                break
+    def get_checkpoint_file(self, protein, worker):
+        """
+        Returns the checkpoint file of a worker, which is the same for every run
+        of this algorithm on this protein so an interrupted run can be resumed.
+        """
+        return os.path.join(self.output_dir, f"{self.algorithm.__name__}_{protein}_{worker}.checkpoint")
 
-        # Save results if any valid solutions were found
-        if all_scores:
-            self.save_results(all_scores, best_score, len(all_scores), final_runtime, protein)
-        else:
-            print("\nNo valid solutions found within the time limit.")
-            return None, None, []
+    def checkpoint(self):
+        """
+        Save a checkpoint when checkpointing is enabled and checkpoint_interval seconds have
+        passed since the last one. Injected into the solver, which calls it at points where
+        its get_state fully describes the search.
+        """
+        if self.checkpoint_file is None or time.time() - self.last_checkpoint_time < self.checkpoint_interval:
+            return
+        self.save_checkpoint(self.checkpoint_file)
+        self.last_checkpoint_time = time.time()
+
+    def save_checkpoint(self, checkpoint_file):
+        """
+        Write the state of the running search to the checkpoint file: the elapsed time,
+        the best folding, the score statistics, the random number generator states and
+        the state of the solver. The file is replaced atomically.
+        """
+        state = {
+            'elapsed_time': time.time() - self.start_time,
+            'best_folding': self.best_folding,
+            'best_score': self.best_score,
+            'result_sink': self.result_sink,
+            'score_file_size': self.result_sink.get_file_size(),
+            'random_state': random.getstate(),
+            'numpy_random_state': np.random.get_state(),
+            'solver_state': self.solver.get_state()
+        }
+        temporary_file = checkpoint_file + '.tmp'
+        with open(temporary_file, 'wb') as f:
+            pickle.dump(state, f)
+        os.replace(temporary_file, checkpoint_file)
+
+    def load_checkpoint(self, checkpoint_file):
+        """
+        Restore the state of an interrupted search from the checkpoint file.
+        The runtime continues from the time elapsed before the checkpoint, and scores
+        written to the score file after the checkpoint are dropped.
+        """
+        with open(checkpoint_file, 'rb') as f:
+            state = pickle.load(f)
 
-        return best_folding, best_score, all_scores
+        self.start_time = time.time() - state['elapsed_time']
+        self.best_folding = state['best_folding']
+        self.best_score = state['best_score']
+        self.result_sink = state['result_sink']
+        self.result_sink.truncate(state['score_file_size'])
+        random.setstate(state['random_state'])
+        np.random.set_state(state['numpy_random_state'])
+        self.solver.set_state(state['solver_state'])
 
-    def save_results(self, all_scores, best_score, num_solutions, final_runtime, protein):
+    def save_results(self, result_sink, best_score, final_runtime, protein, statistics=None):
         """
         Save experiment results to a CSV file.
+        The raw scores are copied from the score files of the sink one at a time,
+        after which the score files are removed. Returns the path of the CSV file.
         """
-        if not all_scores:
-            return
+        if not result_sink.count:
+            return None
         
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
         filename = f"{self.algorithm.__name__}_{timestamp}.csv"
         filepath = os.path.join(self.output_dir, filename)
 
@@ -120,12 +361,28 @@ class TimedExperiment:
             writer.writerow(['Algorithm', self.algorithm.__name__])
             writer.writerow(['Protein', protein])
             writer.writerow(['Final Runtime (s)', f"{final_runtime:.2f}"])
-            writer.writerow(['Total Solutions', num_solutions])
+            writer.writerow(['Workers', self.num_workers])
+            writer.writerow(['Total Solutions', result_sink.count])
             writer.writerow(['Best Score', best_score])
-            writer.writerow(['Average Score', f"{sum(all_scores) / len(all_scores):.2f}"])
+            writer.writerow(['Average Score', f"{result_sink.mean():.2f}"])
+            for name, value in (statistics or {}).items():
+                writer.writerow([name, value])
             writer.writerow([])
             writer.writerow(['Score Index', 'Score'])
 
             # Write all recorded scores
-            for i, score in enumerate(all_scores):
-                writer.writerow([i, score])
\ No newline at end of file
+            for i, score in enumerate(result_sink.iter_scores()):
+                writer.writerow([i, score])
+
+        result_sink.remove_files()
+        return filepath
+
+    def save_metrics(self, metrics, protein, filepath):
+        """
+        Save the metrics of the experiment to a JSON file.
+        With multiple workers the counters and times are summed over the workers.
+        """
+        data = {'algorithm': self.algorithm.__name__, 'protein': protein, 'workers': self.num_workers}
+        data.update(metrics.to_dict())
+        with open(filepath, 'w') as f:
+            json.dump(data, f, indent=2)
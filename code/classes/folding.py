@@ -0,0 +1,102 @@
+import numpy as np
+
+# 3-bit code for every folding direction and back
+DIRECTION_CODES = {1: 0, -1: 1, 2: 2, -2: 3, 3: 4, -3: 5}
+CODE_DIRECTIONS = (1, -1, 2, -2, 3, -3)
+CODE_ARRAY = np.array(CODE_DIRECTIONS + (0, 0), dtype=np.int8)
+BITS_PER_STEP = 3
+
+class PackedFolding:
+    __slots__ = ('bits', 'length')
+
+    def __init__(self, bits=0, length=0):
+        """
+        Immutable folding with every step packed into 3 bits of a single integer.
+        Step i is stored in bits 3i to 3i + 2. Packed foldings are hashable, so they
+        can be used as dict keys and in sets, and are far smaller than lists of ints.
+        """
+        self.bits = bits
+        self.length = length
+
+    @classmethod
+    def from_directions(cls, directions):
+        """
+        Pack a sequence of directions.
+        """
+        if isinstance(directions, PackedFolding):
+            return directions
+
+        bits = 0
+        length = 0
+        for direction in directions:
+            bits |= DIRECTION_CODES[direction] << (BITS_PER_STEP * length)
+            length += 1
+        return cls(bits, length)
+
+    def append(self, direction):
+        """
+        Returns a new packed folding extended with one direction.
+        """
+        return PackedFolding(self.bits | DIRECTION_CODES[direction] << (BITS_PER_STEP * self.length), self.length + 1)
+
+    def extend(self, directions):
+        """
+        Returns a new packed folding extended with a sequence of directions.
+        """
+        other = PackedFolding.from_directions(directions)
+        return PackedFolding(self.bits | other.bits << (BITS_PER_STEP * self.length), self.length + other.length)
+
+    def to_list(self):
+        """
+        Decode to a list of directions.
+        """
+        bits = self.bits
+        return [CODE_DIRECTIONS[(bits >> (BITS_PER_STEP * i)) & 7] for i in range(self.length)]
+
+    def to_array(self):
+        """
+        Decode to an int8 array of directions, vectorized with NumPy.
+        """
+        num_bytes = (BITS_PER_STEP * self.length + 7) // 8
+        raw = np.frombuffer(self.bits.to_bytes(num_bytes, 'little'), dtype=np.uint8)
+        bits = np.unpackbits(raw, bitorder='little')[:BITS_PER_STEP * self.length].reshape(-1, BITS_PER_STEP)
+        codes = bits[:, 0] | bits[:, 1] << 1 | bits[:, 2] << 2
+        return CODE_ARRAY[codes]
+
+    def __len__(self):
+        return self.length
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self.length)
+            if step != 1:
+                return PackedFolding.from_directions(self.to_list()[index])
+            length = max(0, stop - start)
+            mask = (1 << (BITS_PER_STEP * length)) - 1
+            return PackedFolding((self.bits >> (BITS_PER_STEP * start)) & mask, length)
+
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("PackedFolding index out of range")
+        return CODE_DIRECTIONS[(self.bits >> (BITS_PER_STEP * index)) & 7]
+
+    def __eq__(self, other):
+        if not isinstance(other, PackedFolding):
+            return NotImplemented
+        return self.bits == other.bits and self.length == other.length
+
+    def __hash__(self):
+        return hash((self.bits, self.length))
+
+    def __repr__(self):
+        return f"PackedFolding({self.to_list()})"
+
+    def __getstate__(self):
+        return self.bits, self.length
+
+    def __setstate__(self, state):
+        self.bits, self.length = state
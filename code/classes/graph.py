@@ -1,41 +1,60 @@
-from .aminoacid import Aminoacid
+from .aminoacid import Aminoacid, TYPE_CODES, get_energy_table
+
+# Unit vectors for each folding direction
+DIRECTIONS = {
+    1: (1, 0, 0),
+    -1: (-1, 0, 0),
+    2: (0, 1, 0),
+    -2: (0, -1, 0),
+    3: (0, 0, 1),
+    -3: (0, 0, -1)
+}
+
+# Folding direction for each unit vector
+VECTOR_TO_DIRECTION = {vector: direction for direction, vector in DIRECTIONS.items()}
+
+# Offsets to the six lattice neighbours of a position
+NEIGHBOUR_OFFSETS = [(1, 0, 0), (-1, 0, 0), (0, 1, 0), (0, -1, 0), (0, 0, 1), (0, 0, -1)]
 
 class Graph:
-    def __init__(self, protein_sequence):
+    def __init__(self, protein_sequence, energy_model='HPC'):
         """
         Initialize the Graph to store amino acids and manage folding.
+        The amino acids are stored as flat lists: one type code and one position per amino acid.
+        The energy model ('HPC' or 'HP') sets the bond energy between two amino acid types.
         """
         self.protein_sequence = protein_sequence
-        self.amino_acids = self.create_amino_acids(protein_sequence)
+        self.length = len(protein_sequence)
+        self.energy_model = energy_model
+        self.energy_table = get_energy_table(energy_model)
+        self.type_codes = [TYPE_CODES[aa_type] for aa_type in protein_sequence]
+        # Row of the energy table per amino acid, and the amino acids that can bond at all
+        self.energy_rows = [self.energy_table[code] for code in self.type_codes]
+        self.bonding_indices = [i for i, row in enumerate(self.energy_rows) if any(row)]
+        self.can_bond = [any(row) for row in self.energy_rows]
+        self.positions = [(i, 0, 0) for i in range(self.length)]  # Unfolded chain along the x-axis
+        self.amino_acid_views = None
+        self.position_to_index = {}  # Occupancy map of placed amino acids: position -> index
+        self.num_placed = 0  # Number of amino acids placed by the current folding
+        self.folding = []  # Directions of the current (partial) folding
         self.score = 0
-    
+
+    @property
+    def amino_acids(self):
+        """
+        Aminoacid views on the lists of the graph, created on first use.
+        """
+        if self.amino_acid_views is None:
+            self.amino_acid_views = self.create_amino_acids(self.protein_sequence)
+        return self.amino_acid_views
+
     def create_amino_acids(self, protein_sequence):
         """
-        Creates a list of Aminoacid objects based on the protein sequence.
+        Creates a list of Aminoacid views, one per amino acid of the protein sequence.
+        Kept for compatibility, the graph itself stores the types and positions.
         """
-        amino_acids = []
-        position = (0, 0, 0)  # Starting position (origin)
-    
-        # Placing the first amino at the origin
-        amino_acid = Aminoacid(protein_sequence[0], position)
-        amino_acids.append(amino_acid)
-    
-        # For remaining amino's, set positions based on folding directions
-        for aa_type in protein_sequence[1:]:
-            direction = (1, 0, 0)  # Default direction from origin
-            position = self.get_next_position(position, direction)
-        
-            amino_acid = Aminoacid(aa_type, position)
-            amino_acids.append(amino_acid)
-    
-        # Link neighbours for each amino acid
-        for i in range(1, len(amino_acids)):
-            amino_acids[i-1].add_neighbour(amino_acids[i])
-            amino_acids[i].add_neighbour(amino_acids[i-1])
-    
-        return amino_acids
+        return [Aminoacid(self, i) for i in range(len(protein_sequence))]
 
-    
     def get_next_position(self, current_position, direction):
         """
         Get the next position based on the direction and current position.
@@ -52,53 +71,244 @@ class Graph:
         if folding is None:
             print("Error: Folding is None.")
             return False
-        
-        directions = {
-            1: (1, 0, 0),
-            -1: (-1, 0, 0),
-            2: (0, 1, 0),
-            -2: (0, -1, 0),
-            3: (0, 0, 1),
-            -3: (0, 0, -1)
-        }
-
-        coords = [(0, 0, 0)]  # Starting at origin (0, 0, 0)
-        self.visited_positions = set(coords)  # Track the visited positions, start with origin
 
-        for i, step in enumerate(folding):
-            last_coord = coords[-1]  # Get the last position
-            direction = directions[step]  # Get the direction for the current fold step
+        last_coord = (0, 0, 0)  # Starting at origin (0, 0, 0)
+        self.positions[0] = last_coord
+        self.position_to_index = {last_coord: 0}  # Track the occupied positions, start with origin
+        self.num_placed = 1
+        self.folding = list(folding)
 
-            next_coord = tuple(sum(x) for x in zip(last_coord, direction))  # Calculate the next position
+        for i, step in enumerate(folding):
+            dx, dy, dz = DIRECTIONS[step]  # Get the direction for the current fold step
+            next_coord = (last_coord[0] + dx, last_coord[1] + dy, last_coord[2] + dz)  # Calculate the next position
 
             # Check for crossing (previously visited position)
-            if next_coord in self.visited_positions:
+            if next_coord in self.position_to_index:
+                del self.folding[i:]  # Keep only the steps that were placed
                 return False  # Invalid folding due to crossing
 
-            self.amino_acids[i + 1].position = next_coord  # Update position of next amino acid
-            self.visited_positions.add(next_coord)  # Mark the position as visited
+            self.positions[i + 1] = next_coord  # Update position of next amino acid
+            self.position_to_index[next_coord] = i + 1  # Mark the position as occupied
+            self.num_placed += 1
 
-            coords.append(next_coord)  # Add the new coordinate to the list of coordinates
+            last_coord = next_coord
     
         return True  # Folding is valid (no crossings)
 
+    def reset_folding(self):
+        """
+        Reset the graph to an empty folding with only the first amino acid placed at the origin.
+        """
+        self.apply_folding([])
+        self.score = 0
+
+    def set_folding(self, folding):
+        """
+        Build the folding step by step with push_step, keeping the running score up to date.
+        Returns False (with the valid prefix placed) if the folding crosses itself.
+        """
+        self.reset_folding()
+        for direction in folding:
+            if not self.push_step(direction):
+                return False
+        return True
+
+    def push_step(self, direction):
+        """
+        Place the next amino acid one step in the given direction from the last placed one.
+        Updates the occupancy map and the running score in O(1).
+        Returns False and leaves the graph unchanged if the position is occupied.
+        """
+        i = self.num_placed
+        if i >= self.length:
+            return False
+
+        x, y, z = self.positions[i - 1]
+        dx, dy, dz = DIRECTIONS[direction]
+        next_coord = (x + dx, y + dy, z + dz)
+        if next_coord in self.position_to_index:
+            return False
+
+        self.score += self.calculate_step_score(i, next_coord)
+        self.positions[i] = next_coord
+        self.position_to_index[next_coord] = i
+        self.num_placed += 1
+        self.folding.append(direction)
+        return True
+
+    def calculate_step_score(self, i, position):
+        """
+        Calculate the score of the bonds amino acid i forms at the given position with the
+        placed amino acids before it. Used when i is (or would be) the last placed amino acid,
+        so every bond is counted once.
+        """
+        if not self.can_bond[i]:
+            return 0
+
+        total_score = 0
+        get_index = self.position_to_index.get
+        energies = self.energy_rows[i]
+        types = self.type_codes
+        x, y, z = position
+        for dx, dy, dz in NEIGHBOUR_OFFSETS:
+            j = get_index((x + dx, y + dy, z + dz))
+            if j is not None and j < i - 1:
+                total_score += energies[types[j]]
+        return total_score
+
+    def get_free_directions(self):
+        """
+        Returns the directions in which the next amino acid can be placed without crossing.
+        """
+        x, y, z = self.positions[self.num_placed - 1]
+        return [direction for direction, (dx, dy, dz) in DIRECTIONS.items()
+                if (x + dx, y + dy, z + dz) not in self.position_to_index]
+
+    def get_step_options(self):
+        """
+        Returns (direction, score change) for every direction in which the next amino acid
+        can be placed without crossing, without changing the graph.
+        """
+        i = self.num_placed
+        x, y, z = self.positions[i - 1]
+        options = []
+        for direction, (dx, dy, dz) in DIRECTIONS.items():
+            position = (x + dx, y + dy, z + dz)
+            if position not in self.position_to_index:
+                options.append((direction, self.calculate_step_score(i, position)))
+        return options
+
+    def pop_step(self):
+        """
+        Remove the last placed amino acid and its bonds from the running score.
+        Returns the direction of the removed step, or None if only the first amino acid is placed.
+        """
+        i = self.num_placed - 1
+        if i <= 0:
+            return None
+
+        position = self.positions[i]
+        del self.position_to_index[position]
+        self.score -= self.calculate_step_score(i, position)
+        self.num_placed -= 1
+        return self.folding.pop()
+
+    def pop_to(self, length):
+        """
+        Pop steps until the folding has the given number of steps.
+        """
+        while len(self.folding) > length:
+            self.pop_step()
+
     
     def calculate_score(self):
         """
         Calculate the total score for the folding by considering all amino acid bonds.
+        Only the six lattice neighbours of every placed amino acid that can bond are
+        looked up in the occupancy map, so a full evaluation is O(n).
         """
         total_score = 0
-        
-        # Check direct and indirect neighbours
-        for i, aa in enumerate(self.amino_acids):            
-            for j in range(i + 2, len(self.amino_acids)):  # Checking from i+2 to avoid direct neighbours
-                indirect_neighbour = self.amino_acids[j]
-                # Check if amino acids are adjacent in 3D space
-                if self.is_adjacent_in_space(aa, indirect_neighbour):
-                    total_score += aa.calculate_score_with_neighbour(indirect_neighbour)
+        position_to_index = self.position_to_index
+        energy_rows = self.energy_rows
+        types = self.type_codes
+        positions = self.positions
+
+        for i in self.bonding_indices:
+            if i >= self.num_placed:
+                break
+
+            energies = energy_rows[i]
+            x, y, z = positions[i]
+            for dx, dy, dz in NEIGHBOUR_OFFSETS:
+                j = position_to_index.get((x + dx, y + dy, z + dz))
+                # Count each indirect neighbour pair once (j > i + 1 skips direct neighbours)
+                if j is not None and j > i + 1:
+                    total_score += energies[types[j]]
         
         self.score = total_score
         return self.score
+
+    def calculate_contact_score(self, indices):
+        """
+        Calculate the score of all bonds involving at least one of the given amino acids.
+        Bonds between two of the given amino acids are counted once.
+        """
+        total_score = 0
+        position_to_index = self.position_to_index
+        can_bond = self.can_bond
+        energy_rows = self.energy_rows
+        types = self.type_codes
+        positions = self.positions
+
+        for i in indices:
+            if not can_bond[i]:
+                continue
+
+            energies = energy_rows[i]
+            x, y, z = positions[i]
+            for dx, dy, dz in NEIGHBOUR_OFFSETS:
+                j = position_to_index.get((x + dx, y + dy, z + dz))
+                if j is None or abs(i - j) <= 1:
+                    continue
+                # Pairs inside the set are seen from both sides, only count them from the lower index
+                if j in indices and j < i:
+                    continue
+                total_score += energies[types[j]]
+
+        return total_score
+
+    def relocate_residues(self, moves):
+        """
+        Move amino acids to new positions and update the occupancy map.
+        Takes a dict of index -> new position and returns a dict of index -> old position.
+        Does not check for crossings and does not update the score.
+        """
+        old_positions = {}
+        for i in moves:
+            position = self.positions[i]
+            old_positions[i] = position
+            # Only free the position if no other amino acid has already claimed it
+            if self.position_to_index.get(position) == i:
+                del self.position_to_index[position]
+
+        for i, position in moves.items():
+            self.positions[i] = position
+            self.position_to_index[position] = i
+
+        return old_positions
+
+    def calculate_delta_score(self, moves):
+        """
+        Calculate the score change caused by moving amino acids to new positions,
+        without changing the graph. Takes a dict of index -> new position.
+        Only the bonds of the relocated amino acids are evaluated.
+        """
+        score_before = self.calculate_contact_score(moves)
+        old_positions = self.relocate_residues(moves)
+        score_after = self.calculate_contact_score(moves)
+        self.relocate_residues(old_positions)
+        return score_after - score_before
+
+    def move_residues(self, moves):
+        """
+        Move amino acids to new positions and update the score and folding incrementally.
+        Takes a dict of index -> new position and returns the score change.
+        The graph must be fully placed and the moves must not cross the chain.
+        """
+        score_before = self.calculate_contact_score(moves)
+        self.relocate_residues(moves)
+        delta = self.calculate_contact_score(moves) - score_before
+        self.score += delta
+
+        # Only the steps into and out of a moved amino acid change direction
+        positions = self.positions
+        for i in moves:
+            for step in (i - 1, i):
+                if 0 <= step < len(self.folding):
+                    x1, y1, z1 = positions[step]
+                    x2, y2, z2 = positions[step + 1]
+                    self.folding[step] = VECTOR_TO_DIRECTION[(x2 - x1, y2 - y1, z2 - z1)]
+        return delta
     
     def is_adjacent_in_space(self, aa1, aa2):
         """
@@ -117,4 +327,3 @@ class Graph:
         return  (diff_x == 1 and diff_y == 0 and diff_z == 0) or \
                 (diff_x == 0 and diff_y == 1 and diff_z == 0) or \
                 (diff_x == 0 and diff_y == 0 and diff_z == 1)
-    
\ No newline at end of file
@@ -0,0 +1,183 @@
+import time
+from functools import wraps
+
+# Event counters reported by the graph, the batch evaluator and the solvers
+COUNTERS = ['fold_applications', 'invalid_foldings', 'score_evaluations', 'accepted_moves', 'rejected_moves']
+
+# Categories of time measured inside the instrumented methods, everything else is bookkeeping
+TIMERS = ['folding', 'scoring']
+
+class Metrics:
+    def __init__(self):
+        """
+        Collects counters, time per category and the best score over time of a search.
+        Nothing is measured until instrument is called on a solver, so a run without
+        metrics pays no overhead in the hot paths.
+        """
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.timers = dict.fromkeys(TIMERS, 0.0)
+        self.trace = []  # (seconds since the start, best score) at every improvement
+        self.start_time = time.perf_counter()
+        self.runtime = 0.0
+        self.categories = []  # Stack of the timed categories that are running
+        self.last_switch = None
+
+    def count(self, name, amount=1):
+        """
+        Add to an event counter.
+        """
+        self.counters[name] += amount
+
+    def record_best(self, score):
+        """
+        Add a point to the best score versus time trace.
+        """
+        self.trace.append((time.perf_counter() - self.start_time, score))
+
+    def stop(self):
+        """
+        Fix the total runtime of the measured search.
+        """
+        self.runtime = time.perf_counter() - self.start_time
+
+    def wrap(self, method, category=None, on_result=None):
+        """
+        Returns a wrapper of the method that charges its time to the category and passes
+        the result to on_result for counting. Time spent in nested instrumented methods
+        is charged to their own category only.
+        """
+        timers = self.timers
+        categories = self.categories
+        clock = time.perf_counter
+
+        @wraps(method)
+        def wrapper(*args, **kwargs):
+            if category is not None:
+                now = clock()
+                if categories:
+                    timers[categories[-1]] += now - self.last_switch
+                categories.append(category)
+                self.last_switch = now
+                try:
+                    result = method(*args, **kwargs)
+                finally:
+                    now = clock()
+                    timers[categories.pop()] += now - self.last_switch
+                    self.last_switch = now
+            else:
+                result = method(*args, **kwargs)
+
+            if on_result is not None:
+                on_result(result, args)
+            return result
+        return wrapper
+
+    def instrument(self, solver, timed=True):
+        """
+        Replace the hot path methods of the solver's graph and batch evaluator, and the
+        acceptance test of annealing solvers, by measuring wrappers on this instance.
+        Placing a whole folding or a single step counts as a fold application, and every
+        scored candidate (a full score, a delta score, a scored step option or a folding
+        of a batch) as a score evaluation. Steps placed or removed inside another graph
+        method, such as set_folding or pop_step, are not counted again.
+        Without timed, only the counters are kept, which keeps the overhead small.
+        """
+        counters = self.counters
+        nesting = [0]  # Depth of the graph methods that place steps themselves
+
+        def nested(method):
+            @wraps(method)
+            def wrapper(*args, **kwargs):
+                nesting[0] += 1
+                try:
+                    return method(*args, **kwargs)
+                finally:
+                    nesting[0] -= 1
+            return wrapper
+
+        def count_folding(valid, args):
+            if nesting[0]:
+                return
+            counters['fold_applications'] += 1
+            if not valid:
+                counters['invalid_foldings'] += 1
+
+        def count_evaluation(result, args):
+            counters['score_evaluations'] += 1
+
+        def count_options(options, args):
+            counters['score_evaluations'] += len(options)
+
+        def count_batch(result, args):
+            valid, _ = result
+            num_valid = int(valid.sum())
+            counters['fold_applications'] += len(valid)
+            counters['invalid_foldings'] += len(valid) - num_valid
+            counters['score_evaluations'] += num_valid
+
+        def count_acceptance(accepted, args):
+            counters['accepted_moves' if accepted else 'rejected_moves'] += 1
+
+        folding = 'folding' if timed else None
+        scoring = 'scoring' if timed else None
+        graph = solver.graph
+        graph.apply_folding = self.wrap(graph.apply_folding, folding, count_folding)
+        graph.set_folding = self.wrap(nested(graph.set_folding), folding, count_folding)
+        graph.reset_folding = nested(graph.reset_folding)
+        graph.push_step = self.wrap(graph.push_step, folding, count_folding)
+        graph.pop_step = self.wrap(graph.pop_step, folding)
+        graph.relocate_residues = self.wrap(graph.relocate_residues, folding)
+        graph.calculate_score = self.wrap(graph.calculate_score, scoring, count_evaluation)
+        graph.calculate_delta_score = self.wrap(graph.calculate_delta_score, scoring, count_evaluation)
+        graph.get_step_options = self.wrap(graph.get_step_options, scoring, count_options)
+        if timed:
+            # The step and contact scores inside the methods above are only timed, not counted
+            graph.calculate_step_score = self.wrap(graph.calculate_step_score, scoring)
+            graph.calculate_contact_score = self.wrap(graph.calculate_contact_score, scoring)
+
+        if getattr(solver, 'batch_evaluator', None):
+            evaluator = solver.batch_evaluator
+            evaluator.evaluate = self.wrap(evaluator.evaluate, scoring, count_batch)
+        if hasattr(solver, 'accept_move'):
+            solver.accept_move = self.wrap(solver.accept_move, on_result=count_acceptance)
+        solver.metrics = self
+
+    def merge(self, other):
+        """
+        Add the counters, timers and trace of another run, e.g. of another worker.
+        The merged trace keeps the best score over all runs at every point in time.
+        """
+        for name, value in other.counters.items():
+            self.counters[name] += value
+        for name, value in other.timers.items():
+            self.timers[name] += value
+        self.runtime += other.runtime
+
+        trace = []
+        for elapsed, score in sorted(self.trace + other.trace):
+            if not trace or score < trace[-1][1]:
+                trace.append((elapsed, score))
+        self.trace = trace
+
+    def to_dict(self):
+        """
+        Returns all measurements and the derived rates as a JSON serializable dict.
+        """
+        runtime = self.runtime or time.perf_counter() - self.start_time
+        counters = self.counters
+        timers = dict(self.timers)
+        timers['bookkeeping'] = max(0.0, runtime - sum(self.timers.values()))
+        moves = counters['accepted_moves'] + counters['rejected_moves']
+        return {
+            'runtime': runtime,
+            'counters': dict(counters),
+            'time': timers,
+            'rates': {
+                'fold_applications_per_second': counters['fold_applications'] / runtime if runtime else 0,
+                'score_evaluations_per_second': counters['score_evaluations'] / runtime if runtime else 0,
+                'invalid_fraction': (counters['invalid_foldings'] / counters['fold_applications']
+                                     if counters['fold_applications'] else 0),
+                'acceptance_rate': counters['accepted_moves'] / moves if moves else 0
+            },
+            'trace': [{'time': elapsed, 'best_score': score} for elapsed, score in self.trace]
+        }
@@ -0,0 +1,214 @@
+import random
+from itertools import permutations, product
+
+from .graph import NEIGHBOUR_OFFSETS
+
+MOVE_TYPES = ('end', 'corner', 'crankshaft', 'pull', 'pivot')
+
+def create_lattice_symmetries():
+    """
+    Create the 47 non-identity symmetries of the cubic lattice as signed axis permutations.
+    Each symmetry is a tuple of (source axis, sign) for the x, y and z axis.
+    """
+    symmetries = []
+    for axes in permutations(range(3)):
+        for signs in product((1, -1), repeat=3):
+            symmetry = tuple(zip(axes, signs))
+            if symmetry != ((0, 1), (1, 1), (2, 1)):
+                symmetries.append(symmetry)
+    return symmetries
+
+LATTICE_SYMMETRIES = create_lattice_symmetries()
+
+def add(a, b):
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2])
+
+def subtract(a, b):
+    return (a[0] - b[0], a[1] - b[1], a[2] - b[2])
+
+def is_adjacent(a, b):
+    return abs(a[0] - b[0]) + abs(a[1] - b[1]) + abs(a[2] - b[2]) == 1
+
+def perpendicular_offsets(vector):
+    """
+    Returns the four unit vectors perpendicular to the given unit vector.
+    """
+    return [offset for offset in NEIGHBOUR_OFFSETS
+            if offset[0] * vector[0] + offset[1] * vector[1] + offset[2] * vector[2] == 0]
+
+class MoveSet:
+    def __init__(self, graph, move_types=MOVE_TYPES):
+        """
+        Local lattice moves on a fully placed graph.
+        A move is a dict of amino acid index -> new position. End, corner and crankshaft moves
+        relocate one or two amino acids, pull moves relocate a few, pivot moves rotate a tail.
+        Only valid moves (no crossings) are returned, so they can be scored with
+        Graph.calculate_delta_score and applied with Graph.move_residues.
+        """
+        unknown = set(move_types) - set(MOVE_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown move types: {', '.join(sorted(unknown))}")
+
+        self.graph = graph
+        self.move_types = tuple(move_types)
+        self.length = graph.length
+        self.generators = {
+            'end': self.end_moves,
+            'corner': self.corner_moves,
+            'crankshaft': self.crankshaft_moves,
+            'pull': self.pull_moves,
+            'pivot': self.pivot_moves
+        }
+
+    def position(self, index):
+        return self.graph.positions[index]
+
+    def is_free(self, position):
+        return position not in self.graph.position_to_index
+
+    def end_moves(self, index):
+        """
+        Move the first or last amino acid to a free position next to its chain neighbour.
+        """
+        if index == 0:
+            anchor = self.position(1)
+        elif index == self.length - 1:
+            anchor = self.position(index - 1)
+        else:
+            return []
+
+        moves = []
+        for offset in NEIGHBOUR_OFFSETS:
+            new_position = add(anchor, offset)
+            if self.is_free(new_position):
+                moves.append({index: new_position})
+        return moves
+
+    def corner_moves(self, index):
+        """
+        Flip an amino acid in a corner of the chain to the opposite corner of the square.
+        """
+        if index <= 0 or index >= self.length - 1:
+            return []
+
+        previous, current, following = self.position(index - 1), self.position(index), self.position(index + 1)
+        new_position = subtract(add(previous, following), current)
+        if new_position == current or not self.is_free(new_position):
+            return []  # Straight segment or occupied corner
+        return [{index: new_position}]
+
+    def crankshaft_moves(self, index):
+        """
+        Rotate the two amino acids index and index + 1 of a U-shaped segment
+        around the axis through their chain neighbours.
+        """
+        if index <= 0 or index >= self.length - 2:
+            return []
+
+        before, after = self.position(index - 1), self.position(index + 2)
+        if not is_adjacent(before, after):
+            return []
+
+        current_offset = subtract(self.position(index), before)
+        axis = subtract(after, before)
+        moves = []
+        for offset in perpendicular_offsets(axis):
+            if offset == current_offset:
+                continue
+            first, second = add(before, offset), add(after, offset)
+            if self.is_free(first) and self.is_free(second):
+                moves.append({index: first, index + 1: second})
+        return moves
+
+    def pull_moves(self, index):
+        """
+        Pull moves: move the amino acid to a free position diagonal to it and next to one chain
+        neighbour, and pull the rest of the chain on the other side along until it is connected.
+        """
+        moves = []
+        for step in (1, -1):
+            anchor_index, pulled_index = index + step, index - step
+            if not 0 <= anchor_index < self.length:
+                continue
+
+            current, anchor = self.position(index), self.position(anchor_index)
+            for offset in perpendicular_offsets(subtract(current, anchor)):
+                corner = add(anchor, offset)  # Next to the anchor, diagonal to the current position
+                if not self.is_free(corner):
+                    continue
+
+                move = {index: corner}
+                if not 0 <= pulled_index < self.length:
+                    moves.append(move)  # Chain end, nothing to pull
+                    continue
+
+                support = add(current, offset)  # Position that reconnects the pulled side
+                if support == self.position(pulled_index):
+                    moves.append(move)  # Already connected, this is a corner move
+                    continue
+                if not self.is_free(support):
+                    continue
+
+                # Pull the chain along: every amino acid takes the old position two steps ahead
+                move[pulled_index] = support
+                j = pulled_index - step
+                while 0 <= j < self.length and not is_adjacent(self.position(j), move[j + step]):
+                    move[j] = self.position(j + 2 * step)
+                    j -= step
+                moves.append(move)
+        return moves
+
+    def pivot_moves(self, index, symmetries=LATTICE_SYMMETRIES):
+        """
+        Rotate or reflect the shorter side of the chain around the amino acid at index.
+        """
+        if index <= 0 or index >= self.length - 1:
+            return []
+
+        if index < self.length - 1 - index:
+            tail = range(0, index)
+        else:
+            tail = range(index + 1, self.length)
+
+        pivot = self.position(index)
+        relative = [(i, subtract(self.position(i), pivot)) for i in tail]
+        position_to_index = self.graph.position_to_index
+        moves = []
+        for symmetry in symmetries:
+            move = {}
+            for i, vector in relative:
+                new_position = (
+                    pivot[0] + symmetry[0][1] * vector[symmetry[0][0]],
+                    pivot[1] + symmetry[1][1] * vector[symmetry[1][0]],
+                    pivot[2] + symmetry[2][1] * vector[symmetry[2][0]]
+                )
+                occupant = position_to_index.get(new_position)
+                if occupant is not None and occupant not in tail:
+                    break  # Crosses the fixed part of the chain
+                move[i] = new_position
+            else:
+                if any(move[i] != self.position(i) for i in tail):
+                    moves.append(move)
+        return moves
+
+    def generate_moves(self):
+        """
+        Generate all valid moves of the enabled move types for the current folding.
+        """
+        for move_type in self.move_types:
+            generator = self.generators[move_type]
+            for index in range(self.length):
+                yield from generator(index)
+
+    def random_move(self):
+        """
+        Returns a random move, or None if the randomly chosen move is not possible.
+        Pivot moves use a single random symmetry.
+        """
+        move_type = random.choice(self.move_types)
+        index = random.randrange(self.length)
+        if move_type == 'pivot':
+            moves = self.pivot_moves(index, [random.choice(LATTICE_SYMMETRIES)])
+        else:
+            moves = self.generators[move_type](index)
+        return random.choice(moves) if moves else None
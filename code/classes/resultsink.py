@@ -0,0 +1,146 @@
+import bisect
+import os
+
+class ResultSink:
+    def __init__(self, score_file=None, top_k=0):
+        """
+        Collects the scores of an experiment with bounded memory.
+        Keeps online statistics (count, mean, min, max and an exact histogram of the
+        integer scores), and appends the raw scores to score_file when one is given.
+        With top_k, the top_k best distinct foldings added with add_folding are kept.
+        """
+        self.count = 0
+        self.total = 0
+        self.min_score = None
+        self.max_score = None
+        self.histogram = {}  # Score -> number of times it was found
+        self.top_k = top_k
+        self.top_foldings = []  # (score, folding) of the best distinct foldings, best first
+        self.score_files = [score_file] if score_file else []
+        self.file = None
+
+    def add_scores(self, scores):
+        """
+        Add new scores to the statistics and append them to the score file.
+        """
+        if not len(scores):
+            return
+
+        histogram = self.histogram
+        for score in scores:
+            score = int(score)
+            histogram[score] = histogram.get(score, 0) + 1
+            self.total += score
+            if self.min_score is None or score < self.min_score:
+                self.min_score = score
+            if self.max_score is None or score > self.max_score:
+                self.max_score = score
+        self.count += len(scores)
+
+        if self.score_files:
+            if self.file is None:
+                self.file = open(self.score_files[0], 'a')
+            self.file.write(''.join(f"{int(score)}\n" for score in scores))
+
+    def add(self, score):
+        """
+        Add a single score.
+        """
+        self.add_scores([score])
+
+    def add_folding(self, folding, score):
+        """
+        Keep the folding if it is one of the top_k best distinct foldings so far.
+        """
+        if not self.top_k or folding is None:
+            return
+        if len(self.top_foldings) >= self.top_k and score >= self.top_foldings[-1][0]:
+            return
+
+        folding = tuple(int(step) for step in folding)
+        if any(folding == kept for _, kept in self.top_foldings):
+            return
+        bisect.insort(self.top_foldings, (score, folding))
+        del self.top_foldings[self.top_k:]
+
+    def mean(self):
+        """
+        Returns the average score, or None if no scores were added.
+        """
+        return self.total / self.count if self.count else None
+
+    def merge(self, other):
+        """
+        Add the statistics, score files and top foldings of another (closed) sink to
+        this one, e.g. to combine the results of several workers.
+        """
+        self.count += other.count
+        self.total += other.total
+        for score, count in other.histogram.items():
+            self.histogram[score] = self.histogram.get(score, 0) + count
+        if other.min_score is not None and (self.min_score is None or other.min_score < self.min_score):
+            self.min_score = other.min_score
+        if other.max_score is not None and (self.max_score is None or other.max_score > self.max_score):
+            self.max_score = other.max_score
+        self.score_files.extend(path for path in other.score_files if os.path.exists(path))
+        for score, folding in other.top_foldings:
+            self.add_folding(folding, score)
+
+    def iter_scores(self):
+        """
+        Yields all raw scores from the score files, one at a time.
+        """
+        self.close()
+        for path in self.score_files:
+            with open(path) as f:
+                for line in f:
+                    yield int(line)
+
+    def flush(self):
+        """
+        Write the buffered scores to the score file.
+        """
+        if self.file is not None:
+            self.file.flush()
+
+    def get_file_size(self):
+        """
+        Returns the number of bytes written to the score file.
+        """
+        self.flush()
+        if not self.score_files or not os.path.exists(self.score_files[0]):
+            return 0
+        return os.path.getsize(self.score_files[0])
+
+    def truncate(self, size):
+        """
+        Cut the score file back to the given size, dropping the scores written after
+        the statistics of this sink were saved (e.g. in a checkpoint).
+        """
+        self.close()
+        if self.score_files and os.path.exists(self.score_files[0]):
+            with open(self.score_files[0], 'r+') as f:
+                f.truncate(size)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['file'] = None  # Open files cannot be pickled, the file is reopened in append mode
+        return state
+
+    def close(self):
+        """
+        Flush and close the score file, so the sink can be sent to another process.
+        """
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def remove_files(self):
+        """
+        Close and delete the score files.
+        """
+        self.close()
+        for path in self.score_files:
+            if os.path.exists(path):
+                os.remove(path)
+        self.score_files = []
@@ -0,0 +1,152 @@
+import sqlite3
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created TEXT NOT NULL,
+    algorithm TEXT NOT NULL,
+    protein TEXT NOT NULL,
+    energy_model TEXT NOT NULL,
+    seed INTEGER,
+    max_runtime REAL,
+    final_runtime REAL,
+    workers INTEGER,
+    best_score INTEGER,
+    best_folding TEXT,
+    total_solutions INTEGER,
+    average_score REAL,
+    min_score INTEGER,
+    max_score INTEGER
+);
+CREATE INDEX IF NOT EXISTS runs_protein_score ON runs (protein, energy_model, best_score);
+CREATE INDEX IF NOT EXISTS runs_algorithm ON runs (algorithm, protein);
+
+CREATE TABLE IF NOT EXISTS best_foldings (
+    protein TEXT NOT NULL,
+    energy_model TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    folding TEXT NOT NULL,
+    run_id INTEGER REFERENCES runs (id),
+    PRIMARY KEY (protein, energy_model)
+);
+"""
+
+def encode_folding(folding):
+    """
+    Store a folding as its directions separated by spaces.
+    """
+    return ' '.join(str(direction) for direction in folding)
+
+def decode_folding(text):
+    """
+    Decode a folding stored with encode_folding.
+    """
+    return [int(direction) for direction in text.split()]
+
+class ResultStore:
+    def __init__(self, filepath):
+        """
+        Indexed SQLite store of experiment runs and the best known folding per protein.
+        Every run is a row with its settings and score summary, and the best folding per
+        protein and energy model is kept in a separate table, so it can be looked up
+        directly to warm start a new run. Several processes may write to the same file.
+        """
+        self.filepath = filepath
+        self.connection = sqlite3.connect(filepath, timeout=60)
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """
+        Close the database connection.
+        """
+        self.connection.close()
+
+    def add_run(self, algorithm_name, protein, result_sink, best_folding, best_score, energy_model='HPC',
+                seed=None, max_runtime=None, final_runtime=None, workers=1):
+        """
+        Store a run with the score summary of its ResultSink, and replace the best known
+        folding of the protein when this run found a better one.
+        Returns the id of the run.
+        """
+        folding = encode_folding(best_folding) if best_folding is not None else None
+        with self.connection:
+            cursor = self.connection.execute(
+                """INSERT INTO runs (created, algorithm, protein, energy_model, seed, max_runtime, final_runtime,
+                                     workers, best_score, best_folding, total_solutions, average_score,
+                                     min_score, max_score)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (datetime.now().isoformat(), algorithm_name, protein, energy_model, seed, max_runtime,
+                 final_runtime, workers, best_score, folding, result_sink.count, result_sink.mean(),
+                 result_sink.min_score, result_sink.max_score)
+            )
+            run_id = cursor.lastrowid
+
+            if folding is not None:
+                self.connection.execute(
+                    """INSERT INTO best_foldings (protein, energy_model, score, folding, run_id)
+                       VALUES (?, ?, ?, ?, ?)
+                       ON CONFLICT (protein, energy_model) DO UPDATE
+                       SET score = excluded.score, folding = excluded.folding, run_id = excluded.run_id
+                       WHERE excluded.score < best_foldings.score""",
+                    (protein, energy_model, best_score, folding, run_id)
+                )
+        return run_id
+
+    def get_best_folding(self, protein, energy_model='HPC'):
+        """
+        Returns the best known folding of the protein and its score, or (None, None).
+        """
+        row = self.connection.execute(
+            "SELECT folding, score FROM best_foldings WHERE protein = ? AND energy_model = ?",
+            (protein, energy_model)
+        ).fetchone()
+        if row is None:
+            return None, None
+        return decode_folding(row['folding']), row['score']
+
+    def get_runs(self, protein=None, algorithm_name=None, limit=None):
+        """
+        Returns the runs as dicts, best first, optionally only of one protein or algorithm.
+        """
+        conditions = []
+        parameters = []
+        if protein is not None:
+            conditions.append("protein = ?")
+            parameters.append(protein)
+        if algorithm_name is not None:
+            conditions.append("algorithm = ?")
+            parameters.append(algorithm_name)
+
+        query = "SELECT * FROM runs"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY best_score, id"
+        if limit is not None:
+            query += " LIMIT ?"
+            parameters.append(limit)
+        return [dict(row) for row in self.connection.execute(query, parameters)]
+
+    def get_summary(self, protein=None):
+        """
+        Returns one dict per protein, energy model and algorithm with the number of runs
+        and the best and average best score of the runs.
+        """
+        query = """SELECT protein, energy_model, algorithm, COUNT(*) AS runs,
+                          MIN(best_score) AS best_score, AVG(best_score) AS average_best_score,
+                          SUM(total_solutions) AS total_solutions
+                   FROM runs"""
+        parameters = []
+        if protein is not None:
+            query += " WHERE protein = ?"
+            parameters.append(protein)
+        query += " GROUP BY protein, energy_model, algorithm ORDER BY protein, energy_model, best_score"
+        return [dict(row) for row in self.connection.execute(query, parameters)]
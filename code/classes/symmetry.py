@@ -0,0 +1,54 @@
+AXES = (1, 2, 3)
+
+def get_free_axes(fixed_axes=()):
+    """
+    Returns the axes that may be relabelled, in canonical order.
+    """
+    return [axis for axis in AXES if axis not in fixed_axes]
+
+def canonical_folding(folding, fixed_axes=()):
+    """
+    Returns the canonical form of a (partial) folding under the symmetries of the cubic lattice.
+    The free axes are relabelled and reflected in order of first use, so the first step along
+    a new free axis always becomes +1, then +2, then +3 (skipping fixed axes).
+    All rotated and reflected copies of a folding share the same canonical form.
+    Fixed axes are left untouched, e.g. (3,) when a heuristic prescribes steps along z.
+    """
+    free_axes = get_free_axes(fixed_axes)
+    mapping = {axis: axis for axis in fixed_axes}
+    num_used = 0
+    canonical = []
+
+    for step in folding:
+        axis = abs(step)
+        if axis not in mapping:
+            # Map this axis so that its first step is positive
+            target = free_axes[num_used]
+            mapping[axis] = target if step > 0 else -target
+            num_used += 1
+        canonical.append(mapping[axis] if step > 0 else -mapping[axis])
+
+    return tuple(canonical)
+
+def get_canonical_directions(num_free_axes_used, fixed_axes=()):
+    """
+    Returns the directions that extend a canonical folding to a canonical folding:
+    both directions along the fixed and already used axes, and only the positive
+    direction of the next unused free axis. This breaks the lattice symmetry in a search.
+    """
+    free_axes = get_free_axes(fixed_axes)
+    directions = []
+    for axis in list(fixed_axes) + free_axes[:num_free_axes_used]:
+        directions += [axis, -axis]
+    if num_free_axes_used < len(free_axes):
+        directions.append(free_axes[num_free_axes_used])
+    return directions
+
+def count_free_axes_after(num_free_axes_used, direction, fixed_axes=()):
+    """
+    Returns the number of used free axes after extending a canonical folding with a direction.
+    """
+    free_axes = get_free_axes(fixed_axes)
+    if num_free_axes_used < len(free_axes) and direction == free_axes[num_free_axes_used]:
+        return num_free_axes_used + 1
+    return num_free_axes_used
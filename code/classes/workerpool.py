@@ -0,0 +1,30 @@
+import multiprocessing
+
+class WorkerPool:
+    def __init__(self, num_processes=1):
+        """
+        Multiprocessing pool for solvers that spread their work over processes.
+        The pool is only started on first use and is reused until close is called.
+        """
+        self.num_processes = num_processes
+        self.pool = None
+
+    def get_pool(self):
+        """
+        Get the pool, or None when running in a single process.
+        Worker processes (e.g. of a multi-process TimedExperiment) cannot start their own pool.
+        """
+        if self.num_processes <= 1 or multiprocessing.current_process().daemon:
+            return None
+        if self.pool is None:
+            self.pool = multiprocessing.Pool(self.num_processes)
+        return self.pool
+
+    def close(self):
+        """
+        Shut down the pool if one was started.
+        """
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
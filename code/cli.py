@@ -0,0 +1,175 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+from datetime import datetime
+
+from code.algorithms.random import RandomSolution
+from code.algorithms.hillclimber import HillClimber
+from code.algorithms.simannealing import SimulatedAnnealing
+from code.algorithms.tabu import TabuSearch
+from code.algorithms.paralleltempering import ParallelTempering
+from code.algorithms.perm import PERM
+from code.algorithms.genetic import GeneticAlgorithm
+from code.algorithms.breadthfirst import BreadthFirst
+from code.algorithms.depthfirst import DepthFirst
+from code.classes.experiment import TimedExperiment
+from code.visualisation.export import IMAGE_FORMATS, export_visuals
+
+# Algorithms that can be selected by name on the command line
+ALGORITHMS = {algorithm.__name__: algorithm for algorithm in [
+    RandomSolution, HillClimber, SimulatedAnnealing, TabuSearch, ParallelTempering, PERM, GeneticAlgorithm, BreadthFirst, DepthFirst
+]}
+
+SUMMARY_FIELDS = ['Protein', 'Algorithm', 'Seed', 'Max Runtime (s)', 'Best Score',
+                  'Total Solutions', 'Average Score', 'Best Folding']
+
+def read_proteins(args):
+    """
+    Collect the protein sequences from the command line and the sequence file.
+    The file has one sequence per line, empty lines and lines starting with # are skipped.
+    """
+    proteins = list(args.proteins or [])
+    if args.protein_file:
+        with open(args.protein_file) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    proteins.append(line)
+
+    for protein in proteins:
+        if not protein or set(protein) - set('HPC'):
+            raise ValueError(f"Invalid protein sequence: {protein}")
+    return proteins
+
+def create_jobs(args, proteins):
+    """
+    Create one job per combination of protein, algorithm, seed and runtime.
+    With --render every experiment keeps its top_k best foldings.
+    """
+    options = json.loads(args.options) if args.options else {}
+    return [
+        (protein, algorithm, seed, runtime, options.get(algorithm, {}), args.output_dir, args.metrics,
+         args.store, args.warm_start, args.top_k if args.render else 0)
+        for protein in proteins
+        for algorithm in args.algorithms
+        for seed in args.seeds
+        for runtime in args.runtimes
+    ]
+
+def run_job(job):
+    """
+    Run a single experiment without plotting and return its row of the summary table.
+    Used both in-process and in the worker processes of the pool. The row also holds
+    the top foldings of the experiment, which are not written to the summary.
+    """
+    protein, algorithm_name, seed, runtime, options, output_dir, metrics, result_store, warm_start, top_k = job
+    algorithm = ALGORITHMS[algorithm_name]
+
+    with TimedExperiment(algorithm, runtime, seed=seed, output_dir=output_dir, metrics=metrics,
+                         result_store=result_store, warm_start=warm_start, top_k=top_k, **options) as experiment:
+        best_folding, best_score, result_sink = experiment.run(protein)
+
+    return {
+        'Protein': protein,
+        'Algorithm': algorithm_name,
+        'Seed': seed,
+        'Max Runtime (s)': runtime,
+        'Best Score': best_score,
+        'Total Solutions': result_sink.count,
+        'Average Score': f"{result_sink.mean():.2f}" if result_sink.count else None,
+        'Best Folding': ' '.join(str(step) for step in best_folding) if best_folding is not None else None,
+        'Top Foldings': result_sink.top_foldings
+    }
+
+def render_top_foldings(rows, args):
+    """
+    Save images of the top_k best foldings of every experiment, rendered in parallel
+    without a display.
+    """
+    foldings = [
+        (row['Protein'], list(folding), score, row['Algorithm'],
+         f"top{rank}_{row['Algorithm']}_{row['Protein']}_seed{row['Seed']}_{row['Max Runtime (s)']:g}s")
+        for row in rows
+        for rank, (score, folding) in enumerate(row['Top Foldings'], 1)
+    ]
+    return export_visuals(foldings, args.output_dir, args.image_format, args.processes)
+
+def save_summary(rows, output_dir):
+    """
+    Write the summary table of all runs to a CSV file next to the per-run results.
+    """
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    filepath = os.path.join(output_dir, f"summary_{timestamp}.csv")
+    with open(filepath, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(rows)
+    return filepath
+
+def parse_arguments(argv=None):
+    """
+    Parse the command line arguments of the batch runner.
+    """
+    parser = argparse.ArgumentParser(
+        description="Run every combination of proteins, algorithms, seeds and runtimes without plotting."
+    )
+    parser.add_argument('--proteins', nargs='+', help="protein sequences of H, P and C")
+    parser.add_argument('--protein-file', help="file with one protein sequence per line")
+    parser.add_argument('--algorithms', nargs='+', default=['RandomSolution'], choices=sorted(ALGORITHMS),
+                        help="algorithms to run")
+    parser.add_argument('--seeds', nargs='+', type=int, default=[0], help="seeds, one run per seed")
+    parser.add_argument('--runtimes', nargs='+', type=float, default=[10],
+                        help="time budgets in seconds, one run per budget")
+    parser.add_argument('--options', help='algorithm options as JSON, e.g. \'{"RandomSolution": {"batch_size": 10000}}\'')
+    parser.add_argument('--processes', type=int, default=multiprocessing.cpu_count(),
+                        help="number of runs that are executed in parallel")
+    parser.add_argument('--output-dir', default="experiment_results", help="folder for the results")
+    parser.add_argument('--render', action='store_true', help="save images of the best foldings of every run")
+    parser.add_argument('--top-k', type=int, default=1, help="with --render, the k best distinct foldings of every run")
+    parser.add_argument('--image-format', default='png', choices=IMAGE_FORMATS, help="format of the images")
+    parser.add_argument('--metrics', action='store_true', help="export the metrics of every run as JSON")
+    parser.add_argument('--store', help="SQLite database to store every run and the best folding per protein")
+    parser.add_argument('--warm-start', action='store_true',
+                        help="start from the best known folding in the --store database")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    """
+    Run all experiments of the matrix and write the summary table.
+    """
+    args = parse_arguments(argv)
+    try:
+        proteins = read_proteins(args)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        return 2
+    if not proteins:
+        print("No proteins given, use --proteins or --protein-file.", file=sys.stderr)
+        return 2
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    jobs = create_jobs(args, proteins)
+    print(f"Running {len(jobs)} experiments on {min(args.processes, len(jobs))} processes")
+
+    rows = []
+    if args.processes > 1 and len(jobs) > 1:
+        with multiprocessing.Pool(min(args.processes, len(jobs))) as pool:
+            for row in pool.imap(run_job, jobs):
+                print(f"{row['Algorithm']} seed {row['Seed']} on {row['Protein']}: {row['Best Score']}")
+                rows.append(row)
+    else:
+        for job in jobs:
+            row = run_job(job)
+            print(f"{row['Algorithm']} seed {row['Seed']} on {row['Protein']}: {row['Best Score']}")
+            rows.append(row)
+
+    print(f"Summary saved to {save_summary(rows, args.output_dir)}")
+    if args.render:
+        print(f"Saved {len(render_top_foldings(rows, args))} images to {args.output_dir}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
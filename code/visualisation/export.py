@@ -0,0 +1,45 @@
+import multiprocessing
+import os
+
+IMAGE_FORMATS = ['png', 'svg']
+
+def init_render_worker():
+    """
+    Initializer of the render pool: selects the non-interactive Agg backend, so the
+    worker processes need no display. The backend of the calling process is left alone.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+
+def render_worker(args):
+    """
+    Render a single folding to an image file. Used both in-process and in the worker
+    processes of the pool. Matplotlib is only imported here.
+    """
+    protein, folding, score, algorithm_name, filepath = args
+    from code.visualisation.visualise import save_visual
+
+    save_visual(protein, folding, score, algorithm_name, filepath)
+    return filepath
+
+def export_visuals(foldings, output_dir, image_format='png', num_processes=1):
+    """
+    Render foldings to image files in output_dir without showing them.
+    foldings holds (protein, folding, score, algorithm_name, name) tuples, where name is
+    the file name without extension. With num_processes > 1 the images are rendered
+    by a pool of processes that use the Agg backend, otherwise in this process with its
+    current backend. Returns the paths of the image files.
+    """
+    if image_format not in IMAGE_FORMATS:
+        raise ValueError(f"Unknown image format: {image_format}, choose from {IMAGE_FORMATS}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = [
+        (protein, folding, score, algorithm_name, os.path.join(output_dir, f"{name}.{image_format}"))
+        for protein, folding, score, algorithm_name, name in foldings
+    ]
+
+    if num_processes > 1 and len(jobs) > 1:
+        with multiprocessing.Pool(min(num_processes, len(jobs)), init_render_worker) as pool:
+            return pool.map(render_worker, jobs)
+    return [render_worker(job) for job in jobs]
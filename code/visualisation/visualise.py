@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
+from mpl_toolkits.mplot3d.art3d import Line3DCollection
 
 def plot_folding(ax, coords, protein):
     """
@@ -44,35 +45,34 @@ def calculate_coordinates(protein, folding):
 def plot_bonds(ax, coords, protein, position_to_index):
     """
     Plot indirect bonds between amino acids that are adjacent in 3D space.
+    Neighbours are looked up in the position map, only in the positive direction of
+    every axis so each pair is found once, and all bonds are drawn as one collection.
     """
-    # Define bond styles based on amino acid types
-    bond_styles = {
-        ('H', 'H'): ('red', '--', 2),
-        ('C', 'C'): ('green', '--', 2),
-        ('H', 'C'): ('blue', '--', 2),
-        ('C', 'H'): ('blue', '--', 2)
+    # Define bond colors based on amino acid types
+    bond_colors = {
+        ('H', 'H'): 'red',
+        ('C', 'C'): 'green',
+        ('H', 'C'): 'blue',
+        ('C', 'H'): 'blue'
     }
-    
-    # Check each pair of coordinates for potential bonds
-    for i, coord1 in enumerate(coords):
-        x1, y1, z1 = coord1
-        for j, coord2 in enumerate(coords):
-            # Skip if same amino acid or direct neighbors
-            if abs(i - j) <= 1:
+
+    segments = []
+    colors = []
+    for i, (x, y, z) in enumerate(coords):
+        for neighbour in ((x + 1, y, z), (x, y + 1, z), (x, y, z + 1)):
+            j = position_to_index.get(neighbour)
+
+            # Skip empty positions and direct neighbours in the chain
+            if j is None or abs(i - j) <= 1:
                 continue
-                
-            x2, y2, z2 = coord2
-            # Check if amino acids are adjacent in 3D space
-            if (abs(x1 - x2) + abs(y1 - y2) + abs(z1 - z2)) == 1:
-                aa1_type = protein[i]
-                aa2_type = protein[j]
-                
-                # Get bond style if there is a bond
-                bond_style = bond_styles.get((aa1_type, aa2_type))
-                if bond_style:
-                    color, style, width = bond_style
-                    ax.plot([x1, x2], [y1, y2], [z1, z2], 
-                           color=color, linestyle=style, linewidth=width, alpha=0.7)
+
+            color = bond_colors.get((protein[i], protein[j]))
+            if color:
+                segments.append([(x, y, z), neighbour])
+                colors.append(color)
+
+    if segments:
+        ax.add_collection3d(Line3DCollection(segments, colors=colors, linestyles='--', linewidths=2, alpha=0.7))
 
 def print_visual(protein, folding, graph, algorithm):
     """
@@ -81,7 +81,23 @@ def print_visual(protein, folding, graph, algorithm):
     if folding is None:
         print("Error: Folding is None.")
         return False
-    
+
+    create_visual(protein, folding, graph.calculate_score(), algorithm.__name__)
+    plt.show()
+
+def save_visual(protein, folding, score, algorithm_name, filepath):
+    """
+    Save the visual representation of the protein folding to an image file,
+    without showing it. The format follows from the extension, e.g. .png or .svg.
+    """
+    fig = create_visual(protein, folding, score, algorithm_name)
+    fig.savefig(filepath)
+    plt.close(fig)
+
+def create_visual(protein, folding, score, algorithm_name):
+    """
+    Create the figure with the 3D representation of the protein folding.
+    """
     # Calculate coordinates and create position mapping
     coords, position_to_index = calculate_coordinates(protein, folding)
     
@@ -96,7 +112,7 @@ def print_visual(protein, folding, graph, algorithm):
     plot_bonds(ax, coords, protein, position_to_index)
     
     # Set labels and viewing angle
-    ax.set_title(f'Protein Folding for {protein}\nScore: {graph.calculate_score()}\n Algorithm: {algorithm.__name__}')
+    ax.set_title(f'Protein Folding for {protein}\nScore: {score}\n Algorithm: {algorithm_name}')
     ax.set_xlabel('X', fontsize=12)
     ax.set_ylabel('Y', fontsize=12)
     ax.set_zlabel('Z', fontsize=12)
@@ -104,4 +120,4 @@ def print_visual(protein, folding, graph, algorithm):
     ax.view_init(elev=20, azim=45)
     
     plt.tight_layout()
-    plt.show()
+    return fig
@@ -1,46 +1,76 @@
 from code.algorithms.random import RandomSolution
 from code.algorithms.hillclimber import HillClimber
 from code.algorithms.simannealing import SimulatedAnnealing
+from code.algorithms.tabu import TabuSearch
+from code.algorithms.paralleltempering import ParallelTempering
+from code.algorithms.perm import PERM
+from code.algorithms.genetic import GeneticAlgorithm
 from code.algorithms.breadthfirst import BreadthFirst
 from code.algorithms.depthfirst import DepthFirst
-from code.visualisation.visualise import print_visual
 from code.classes.experiment import TimedExperiment
-import matplotlib.pyplot as plt
+from code.classes.graph import Graph
+from code.visualisation.export import export_visuals
 
 def main():
     #---------------------------------Choose your protein, algorithm and runtime-------------------------------------#
     proteins = ["HCPHPHPHCHHHHPCCPPHPPPHPPPPCPPPHPPPHPHHHHCHPHPHPHH"] # Max 50 characters
-    algorithm =  RandomSolution # Choose from RandomSolution, HillClimber, SimulatedAnnealing, BreadthFirst, DepthFirst
+    algorithm =  RandomSolution # Choose from RandomSolution, HillClimber, SimulatedAnnealing, TabuSearch, ParallelTempering, PERM, GeneticAlgorithm, BreadthFirst, DepthFirst
+    algorithm_options = {} # Extra options for the algorithm, e.g. {"batch_size": 10000} for RandomSolution
     max_runtime = 10 # in seconds
+    num_workers = 1 # Number of processes that run the algorithm in parallel
+    checkpoint_interval = None # Seconds between checkpoints of the experiment, None to disable
+    resume = False # Continue from the latest checkpoint of an interrupted run
+    metrics = False # Export counters, time per phase and the best score over time as JSON
+    result_store = None # SQLite database to store every run and the best folding per protein, e.g. "experiment_results/results.db"
+    warm_start = False # Start from the best known folding in the result_store
+    export_top_k = 0 # Save images of the k best distinct foldings of every experiment, 0 to disable
+    image_format = "png" # Format of the saved images, "png" or "svg"
     #----------------------------------------------------------------------------------------------------------------#
 
     # Initialize experiment handler
-    experiment = TimedExperiment(algorithm, max_runtime)
+    experiment = TimedExperiment(algorithm, max_runtime, num_workers, checkpoint_interval=checkpoint_interval,
+                                 resume=resume, metrics=metrics, result_store=result_store, warm_start=warm_start,
+                                 top_k=export_top_k, **algorithm_options)
 
     for protein in proteins:
         print(f"\nProcessing protein: {protein}")
         print(f"Using Algorithm: {algorithm.__name__}")
 
         # Run the experiment
-        best_folding, best_score, all_scores = experiment.run(protein)
+        best_folding, best_score, result_sink = experiment.run(protein)
 
         # Output the best folding and its score
         print(f"Best folding: {best_folding}\nScore: {best_score}")
 
-        # Visualize the best folding from the experiment
-        experiment_solver = experiment.algorithm(protein)
-        experiment_solver.graph.apply_folding(best_folding)
-        print_visual(protein, best_folding, experiment_solver.graph, algorithm)
+        # Save images of the best foldings of this experiment
+        if export_top_k and result_sink.top_foldings:
+            foldings = [
+                (protein, list(folding), score, algorithm.__name__, f"top{rank}_{algorithm.__name__}_{protein}")
+                for rank, (score, folding) in enumerate(result_sink.top_foldings, 1)
+            ]
+            paths = export_visuals(foldings, experiment.output_dir, image_format, num_workers)
+            print(f"Saved {len(paths)} images to {experiment.output_dir}")
 
-        # Create histogram of all scores from the experiment
+        # Visualize the best folding from the experiment, matplotlib is only imported when plotting
+        import matplotlib.pyplot as plt
+        from code.visualisation.visualise import print_visual
+        graph = Graph(protein, experiment.energy_model)  # Score with the energy model of the experiment
+        if best_folding is not None:
+            graph.apply_folding(best_folding)
+        print_visual(protein, best_folding, graph, algorithm)
+
+        # Create histogram of all scores from the experiment, one bar per score
         plt.figure(figsize=(10, 6))
-        plt.hist(all_scores, bins=min(50, len(set(all_scores)) or 1))
+        scores = sorted(result_sink.histogram)
+        plt.bar(scores, [result_sink.histogram[score] for score in scores], width=1.0)
         plt.title(f'Distribution of Scores for: {protein}\nBest Score: {best_score}\nAlgorithm: {algorithm.__name__}')
         plt.xlabel('Score')
         plt.ylabel('Frequency')
         plt.grid(True)
         plt.show()
 
+    experiment.close()
+
 if __name__ == "__main__":
     main()
 
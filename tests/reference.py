@@ -0,0 +1,80 @@
+import random
+
+# Unit vectors for each folding direction, kept separate from the code under test
+DIRECTIONS = {1: (1, 0, 0), -1: (-1, 0, 0), 2: (0, 1, 0), -2: (0, -1, 0), 3: (0, 0, 1), -3: (0, 0, -1)}
+
+# Bond energy per pair of amino acid types
+ENERGIES = {
+    'HPC': {('H', 'H'): -1, ('H', 'C'): -1, ('C', 'H'): -1, ('C', 'C'): -5},
+    'HP': {('H', 'H'): -1, ('H', 'C'): -1, ('C', 'H'): -1, ('C', 'C'): -1}
+}
+
+def calculate_coordinates(folding):
+    """
+    Returns the lattice positions of the folding, or None if it crosses itself.
+    """
+    positions = [(0, 0, 0)]
+    for direction in folding:
+        position = tuple(a + b for a, b in zip(positions[-1], DIRECTIONS[direction]))
+        if position in positions:
+            return None
+        positions.append(position)
+    return positions
+
+def naive_score(protein, folding, energy_model='HPC'):
+    """
+    Score a folding by comparing every pair of amino acids that are not neighbours in the
+    chain, or None if the folding crosses itself.
+    """
+    positions = calculate_coordinates(folding)
+    if positions is None:
+        return None
+
+    energies = ENERGIES[energy_model]
+    score = 0
+    for i in range(len(positions)):
+        for j in range(i + 2, len(positions)):
+            if sum(abs(a - b) for a, b in zip(positions[i], positions[j])) == 1:
+                score += energies.get((protein[i], protein[j]), 0)
+    return score
+
+def random_walk(num_steps, rng=random):
+    """
+    Returns a random folding of num_steps steps that does not cross itself.
+    """
+    while True:
+        positions = [(0, 0, 0)]
+        folding = []
+        for _ in range(num_steps):
+            options = [
+                direction for direction, vector in DIRECTIONS.items()
+                if tuple(a + b for a, b in zip(positions[-1], vector)) not in positions
+            ]
+            if not options:
+                break
+            direction = rng.choice(options)
+            folding.append(direction)
+            positions.append(tuple(a + b for a, b in zip(positions[-1], DIRECTIONS[direction])))
+        if len(folding) == num_steps:
+            return folding
+
+def brute_force_minimum(protein, energy_model='HPC'):
+    """
+    Returns the lowest score over all foldings of the protein that do not cross themselves.
+    The first step is fixed, since rotated foldings have the same score.
+    """
+    num_steps = len(protein) - 1
+    if num_steps == 0:
+        return 0
+
+    best_score = 0
+    stack = [[1]]
+    while stack:
+        folding = stack.pop()
+        if calculate_coordinates(folding) is None:
+            continue
+        if len(folding) == num_steps:
+            best_score = min(best_score, naive_score(protein, folding, energy_model))
+            continue
+        stack.extend(folding + [direction] for direction in DIRECTIONS)
+    return best_score
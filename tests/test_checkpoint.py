@@ -0,0 +1,58 @@
+import os
+import pickle
+
+from code.algorithms.depthfirst import DepthFirst
+from code.algorithms.random import RandomSolution
+from code.classes.experiment import TimedExperiment
+
+from reference import naive_score
+
+def run_search(algorithm, runtime, protein, output_dir, resume=False, **algorithm_options):
+    """
+    Run one search with checkpoints at short intervals and return the results of
+    run_search together with the paths of the score and checkpoint files.
+    """
+    score_file = os.path.join(output_dir, 'search.scores')
+    checkpoint_file = os.path.join(output_dir, 'search.checkpoint')
+    experiment = TimedExperiment(algorithm, runtime, checkpoint_interval=0.01, resume=resume, output_dir=output_dir,
+                                 **algorithm_options)
+    results = experiment.run_search(protein, 0, False, score_file, checkpoint_file)
+    return results, score_file, checkpoint_file
+
+def test_resume_completes_exact_search(tmp_path):
+    protein = 'HPHPPHHPHPPH'
+    expected = DepthFirst(protein, branch_and_bound=True).find_solutions()[1]
+
+    # The first run is cut off by the deadline, the resumed run finishes the search
+    results, score_file, checkpoint_file = run_search(DepthFirst, 0.2, protein, str(tmp_path), branch_and_bound=True)
+    with open(checkpoint_file, 'rb') as f:
+        state = pickle.load(f)
+    assert not state['solver_state']['search_complete']
+    assert state['solver_state']['exact_search'] is not None
+
+    results, score_file, checkpoint_file = run_search(DepthFirst, 60, protein, str(tmp_path), resume=True,
+                                                      branch_and_bound=True)
+    folding, score = results[0], results[1]
+    assert score == expected
+    assert naive_score(protein, folding) == score
+
+def test_resume_keeps_scores(tmp_path):
+    protein = 'HCPHPHPHCHHHHPCC'
+    results, score_file, checkpoint_file = run_search(RandomSolution, 0.3, protein, str(tmp_path))
+    with open(checkpoint_file, 'rb') as f:
+        state = pickle.load(f)
+    saved_sink = state['result_sink']
+    assert saved_sink.count
+
+    results, score_file, checkpoint_file = run_search(RandomSolution, 0.6, protein, str(tmp_path), resume=True)
+    folding, score, result_sink = results[:3]
+    assert result_sink.count > saved_sink.count
+    assert score <= state['best_score']
+    assert naive_score(protein, folding) == score
+
+    # Scores written after the checkpoint of the first run were dropped, so the file matches the statistics
+    with open(score_file) as f:
+        scores = [int(line) for line in f]
+    assert len(scores) == result_sink.count
+    assert sum(scores) == result_sink.total
+    assert min(scores) == result_sink.min_score
@@ -0,0 +1,42 @@
+import pickle
+
+import pytest
+
+from code.algorithms.depthfirst import DepthFirst
+
+from reference import brute_force_minimum, naive_score
+
+PROTEINS = ['H', 'HH', 'HPH', 'HHPH', 'HPHPPH', 'HHPPHHP', 'HCPHCHPC', 'CHHCPHHC']
+
+@pytest.mark.parametrize('symmetry', [True, False])
+@pytest.mark.parametrize('energy_model', ['HPC', 'HP'])
+@pytest.mark.parametrize('protein', PROTEINS)
+def test_branch_and_bound_matches_brute_force(protein, energy_model, symmetry):
+    solver = DepthFirst(protein, branch_and_bound=True, symmetry=symmetry, energy_model=energy_model)
+    folding, score, scores = solver.find_solutions()
+
+    assert solver.search_complete
+    assert len(folding) == len(protein) - 1
+    assert naive_score(protein, folding, energy_model) == score
+    assert score == brute_force_minimum(protein, energy_model)
+
+def test_branch_and_bound_resumes_from_state():
+    protein = 'CHPHCPHHPCHH'
+    expected = DepthFirst(protein, branch_and_bound=True).find_solutions()[1]
+
+    # Pause at every deadline check and continue in a new solver from the saved state
+    state = None
+    for num_pauses in range(1000):
+        solver = DepthFirst(protein, branch_and_bound=True)
+        solver.is_time_exceeded = lambda: True
+        if state is not None:
+            solver.set_state(pickle.loads(pickle.dumps(state)))
+        folding, score, scores = solver.find_solutions()
+        state = solver.get_state()
+        if state['search_complete']:
+            break
+
+    assert state['search_complete']
+    assert num_pauses > 2
+    assert score == expected
+    assert naive_score(protein, folding) == score
@@ -0,0 +1,89 @@
+import random
+
+import numpy as np
+import pytest
+
+from code.classes.batchevaluator import BatchEvaluator
+from code.classes.graph import Graph
+from code.classes.moveset import MoveSet, MOVE_TYPES
+
+from reference import DIRECTIONS, naive_score, random_walk
+
+PROTEIN = "HCPHPHPHCHHHHPCCPPHPPPHPPPPCPPPHPPPHPHHHHCHPHPHPHH"
+
+def random_foldings(num_steps, count, rng, crossing_fraction=0.3):
+    """
+    Random foldings that do not cross themselves, with one random direction changed in
+    about crossing_fraction of them, so many of those do cross themselves.
+    """
+    foldings = []
+    for _ in range(count):
+        folding = random_walk(num_steps, rng)
+        if rng.random() < crossing_fraction:
+            folding[rng.randrange(num_steps)] = rng.choice(list(DIRECTIONS))
+        foldings.append(folding)
+    return foldings
+
+@pytest.mark.parametrize('energy_model', ['HPC', 'HP'])
+def test_calculate_score_matches_naive_score(energy_model):
+    rng = random.Random(1)
+    graph = Graph(PROTEIN, energy_model)
+    for folding in random_foldings(len(PROTEIN) - 1, 200, rng):
+        expected = naive_score(PROTEIN, folding, energy_model)
+        assert graph.apply_folding(folding) == (expected is not None)
+        if expected is not None:
+            assert graph.calculate_score() == expected
+
+@pytest.mark.parametrize('energy_model', ['HPC', 'HP'])
+@pytest.mark.parametrize('move_type', MOVE_TYPES)
+def test_calculate_delta_score_matches_naive_score(energy_model, move_type):
+    rng = random.Random(2)
+    graph = Graph(PROTEIN, energy_model)
+    move_set = MoveSet(graph, (move_type,))
+    num_moves = 0
+    for _ in range(10):
+        graph.set_folding(random_walk(len(PROTEIN) - 1, rng))
+        score = graph.calculate_score()
+        for _ in range(10):
+            moves = list(move_set.generate_moves())
+            moves = rng.sample(moves, min(10, len(moves)))
+            if not moves:
+                break
+            for move in moves:
+                graph.calculate_delta_score(move)
+                assert graph.score == score  # Scoring a move leaves the folding alone
+            move = moves[0]
+            delta = graph.calculate_delta_score(move)
+            graph.move_residues(move)
+            assert graph.score == score + delta
+            assert graph.calculate_score() == score + delta
+            assert naive_score(PROTEIN, graph.folding, energy_model) == score + delta
+            score += delta
+            num_moves += 1
+    assert num_moves
+
+@pytest.mark.parametrize('energy_model', ['HPC', 'HP'])
+@pytest.mark.parametrize('length', [2, 14, 50])
+def test_batch_evaluate_matches_naive_score(energy_model, length):
+    rng = random.Random(3)
+    protein = PROTEIN[:length]
+    foldings = random_foldings(length - 1, 200, rng)
+    valid, scores = BatchEvaluator(protein, 3, energy_model).evaluate(np.array(foldings, dtype=np.int8))
+
+    for folding, is_valid, score in zip(foldings, valid, scores):
+        expected = naive_score(protein, folding, energy_model)
+        assert is_valid == (expected is not None)
+        if is_valid:
+            assert score == expected
+
+def test_batch_random_foldings_match_naive_score():
+    evaluator = BatchEvaluator(PROTEIN[:14], 4)
+    foldings = evaluator.generate_random_foldings(500)
+    valid, scores = evaluator.evaluate(foldings)
+
+    assert valid.any()
+    for folding, is_valid, score in zip(foldings.tolist(), valid, scores):
+        expected = naive_score(PROTEIN[:14], folding)
+        assert is_valid == (expected is not None)
+        if is_valid:
+            assert score == expected